@@ -0,0 +1,103 @@
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+import yaml
+
+from redband.artifact import build_artifact
+from redband.serialization import config_to_payload, payload_to_dict
+from redband.server import (
+    _parse_entrypoint_identity,
+    _WarmEntrypoint,
+    benchmark,
+    compose_remote,
+    get_config_lib_dir,
+    serve,
+)
+
+
+def get_commands_parser() -> argparse.ArgumentParser:
+    """Returns the parser of the `redband` command-line tool (distinct from the parser of each entrypoint)."""
+    parser = argparse.ArgumentParser(prog="redband", description="RedBand command-line tools")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    serve_parser = subparsers.add_parser("serve", help="Run a compose server that keeps config composition warm")
+    serve_parser.add_argument("--socket", help="The Unix socket to listen on (defaults to a per-user temp file)")
+
+    entrypoint_help = "The entrypoint to compose for, as '<path/to/script.py>[:<entrypoint function name>]'"
+    overrides_help = "Command-line arguments to pass to the entrypoint (overrides, --yaml-name, etc.)"
+
+    compose_parser = subparsers.add_parser("compose", help="Compose & print an entrypoint's config")
+    compose_parser.add_argument("--socket", help="The Unix socket of a running compose server")
+    compose_parser.add_argument(
+        "--no-server", action="store_true", default=False, help="Compose locally, without a compose server"
+    )
+    compose_parser.add_argument("entrypoint", help=entrypoint_help)
+    compose_parser.add_argument("entrypoint_args", nargs=argparse.REMAINDER, help=overrides_help)
+
+    build_parser = subparsers.add_parser(
+        "build", help="Compose an entrypoint's config once & save it as a compiled config for `--config`"
+    )
+    build_parser.add_argument(
+        "--output",
+        "-o",
+        default="config.rbc",
+        help="Where to save the compiled config, as JSON ('.rbc') or as a generated Python module ('.py')",
+    )
+    build_parser.add_argument("entrypoint", help=entrypoint_help)
+    build_parser.add_argument("entrypoint_args", nargs=argparse.REMAINDER, help=overrides_help)
+
+    benchmark_parser = subparsers.add_parser(
+        "benchmark", help="Compare launches/sec of cold composition against composition via a compose server"
+    )
+    benchmark_parser.add_argument("--n-launches", "-n", type=int, default=20)
+    benchmark_parser.add_argument("entrypoint", help=entrypoint_help)
+    benchmark_parser.add_argument("entrypoint_args", nargs=argparse.REMAINDER, help=overrides_help)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = get_commands_parser().parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.socket)
+
+    elif args.command == "compose":
+        entrypoint_file_path, entrypoint_name = _parse_entrypoint_identity(args.entrypoint)
+        if args.no_server:
+            warm_entrypoint = _WarmEntrypoint(
+                entrypoint_file_path,
+                entrypoint_name,
+                get_config_lib_dir(args.entrypoint_args, default=os.getenv("RB_CONFIG_LIB_DIR")),
+            )
+            config = warm_entrypoint.compose(args.entrypoint_args)
+            config_payload = config_to_payload(config)
+        else:
+            config_payload = compose_remote(
+                entrypoint_file_path, entrypoint_name, args.entrypoint_args, socket_path=args.socket
+            )
+        print(yaml.dump(payload_to_dict(config_payload), sort_keys=False), end="")
+
+    elif args.command == "build":
+        entrypoint_file_path, entrypoint_name = _parse_entrypoint_identity(args.entrypoint)
+        warm_entrypoint = _WarmEntrypoint(
+            entrypoint_file_path,
+            entrypoint_name,
+            get_config_lib_dir(args.entrypoint_args, default=os.getenv("RB_CONFIG_LIB_DIR")),
+        )
+        artifact = build_artifact(warm_entrypoint.compose(args.entrypoint_args), args.output)
+        print(f"[redband] saved compiled config to '{args.output}' (schema {artifact['schema_fingerprint'][:12]})")
+
+    elif args.command == "benchmark":
+        results = benchmark(args.entrypoint, args.entrypoint_args, n_launches=args.n_launches)
+        print(f"cold composition:    {results['cold_launches_per_s']:.2f} launches/s")
+        print(f"via compose server:  {results['server_launches_per_s']:.2f} launches/s")
+        print(f"speedup:             {results['speedup']:.1f}x")
+        print(f"warm server compose: {results['server_compose_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
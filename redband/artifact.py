@@ -0,0 +1,164 @@
+import hashlib
+import importlib.util
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Type
+
+from pydantic.json import pydantic_encoder
+from pydantic.typing import get_args, get_origin
+
+from redband import util as rb_util
+from redband.base import BaseConfig, InstantiableConfig, is_config_node
+from redband.serialization import _resolve_config_class, config_from_payload, CONFIG_KEY, config_to_payload, VALUES_KEY
+from redband.typing import DictStrAny
+
+# compiled configs are saved either as JSON (.rbc) or as a generated Python module (.py)
+ARTIFACT_SUFFIX = ".rbc"
+PYTHON_ARTIFACT_SUFFIX = ".py"
+ARTIFACT_FORMAT_VERSION = 1
+
+
+class ArtifactException(Exception):
+    ...
+
+
+def is_artifact_path(file_path: str) -> bool:
+    return Path(file_path).suffix in {ARTIFACT_SUFFIX, PYTHON_ARTIFACT_SUFFIX}
+
+
+def _type_name(type_: Any) -> str:
+    """Names a (possibly generic) type without its module, s.t. config classes defined in an entrypoint script
+    have the same schema whether the script is run as `__main__` or imported by `redband build`.
+    """
+    args = get_args(type_)
+    if args:
+        return f"{_type_name(get_origin(type_))}[{', '.join(_type_name(arg) for arg in args)}]"
+    return getattr(type_, "__qualname__", None) or str(type_)
+
+
+def schema_fingerprint(config_class: Type[BaseConfig], config_payload: Optional[DictStrAny] = None) -> str:
+    """Hashes the field names & types of a config class and, recursively, of its sub-config classes. Defaults
+    are deliberately excluded as a compiled config stores every value, so only changes to the structure of the
+    config classes invalidate it.
+
+    Args:
+        config_class: the (entrypoint) config class
+        config_payload:
+            the payload of a config of this class (see `redband.serialization`). If given, the classes selected
+            for each of its sub-configs (e.g. an `AdamConfig` for a field declared as `OptimizerConfig`) are
+            hashed too.
+    """
+
+    def _original(cls: Type[BaseConfig]) -> Type[BaseConfig]:
+        return cls.__redband_copy_of__ if cls._is_copy() else cls
+
+    def _schema(cls: Type[BaseConfig], seen: Set[type]) -> DictStrAny:
+        seen = seen | {cls}
+        schema = {}
+        for name, field in cls.__fields__.items():
+            sub_config_class = field.type_ if is_config_node(field.type_) and field.type_ not in seen else None
+            schema[name] = [
+                _type_name(field.outer_type_),
+                _schema(sub_config_class, seen) if sub_config_class else None,
+            ]
+        return schema
+
+    def _payload_schema(payload: Any, cls: Optional[Type[BaseConfig]] = None) -> Any:
+        if isinstance(payload, dict) and CONFIG_KEY in payload:
+            cls = _original(cls or _resolve_config_class(payload[CONFIG_KEY]))
+            values_schema = {k: _payload_schema(v) for k, v in payload[VALUES_KEY].items()}
+            return [cls.__qualname__, {k: _type_name(f.outer_type_) for k, f in cls.__fields__.items()}, values_schema]
+        if isinstance(payload, dict):
+            return {k: _payload_schema(v) for k, v in payload.items()}
+        if isinstance(payload, list):
+            return [_payload_schema(v) for v in payload]
+        return None
+
+    config_class = _original(config_class)
+    schema = [_schema(config_class, set()), _payload_schema(config_payload, config_class)]
+    schema_json = json.dumps(schema, sort_keys=True)
+    return hashlib.sha256(schema_json.encode("utf-8")).hexdigest()
+
+
+def _resolve_targets(config: BaseConfig, prefix: str = "") -> Dict[str, str]:
+    """Finds the `target__` of every instantiable (sub-)config, checking that each one can be imported."""
+    # NB: imported here s.t. loading (rather than building) an artifact never imports redband.instantiate
+    from redband.instantiate import _resolve_target
+
+    targets = {}
+    if isinstance(config, InstantiableConfig):
+        full_key = prefix.rstrip(".") or None
+        _resolve_target(config.target__, full_key=full_key)
+        targets[full_key or ""] = config.target__
+    for key in config.__fields__:
+        value = getattr(config, key)
+        if isinstance(value, BaseConfig):
+            targets.update(_resolve_targets(value, prefix=f"{prefix}{key}."))
+    return targets
+
+
+def build_artifact(config: BaseConfig, file_path: str) -> DictStrAny:
+    """Saves a composed, validated config as a self-contained "compiled config" that an entrypoint can load
+    (via `--config`) without building its ConfigLibrary, composing, or revalidating. If `file_path` ends in
+    '.py' the artifact is generated as a Python module, which is byte-compiled (and cached) on import.
+
+    Returns the artifact
+    """
+    from redband import __version__
+
+    # NB: round-trip through JSON s.t. all values are plain JSON types
+    config_payload = json.loads(json.dumps(config_to_payload(config), default=pydantic_encoder))
+    artifact = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "redband_version": __version__,
+        "schema_fingerprint": schema_fingerprint(type(config), config_payload),
+        "targets": _resolve_targets(config),
+        "config": config_payload,
+    }
+
+    if Path(file_path).suffix == PYTHON_ARTIFACT_SUFFIX:
+        with open(file_path, "w") as f:
+            f.write('"""Compiled config generated by `redband build`, do not edit."""\n\n')
+            f.write("import json\n\n")
+            # NB: the artifact is embedded as JSON (rather than a Python literal) s.t. non-finite floats round-trip
+            f.write(f"ARTIFACT = json.loads({json.dumps(artifact)!r})\n")
+    elif Path(file_path).suffix == ARTIFACT_SUFFIX:
+        with rb_util._tmp_copy_on_close(file_path) as tmp_file:
+            with open(tmp_file, "w") as f:
+                json.dump(artifact, f, separators=(",", ":"))
+    else:
+        raise ArtifactException(f"Compiled configs must be saved as '{ARTIFACT_SUFFIX}' or '{PYTHON_ARTIFACT_SUFFIX}'")
+
+    return artifact
+
+
+def _read_artifact(file_path: str) -> DictStrAny:
+    if Path(file_path).suffix == PYTHON_ARTIFACT_SUFFIX:
+        spec = importlib.util.spec_from_file_location(f"_redband_artifact_{Path(file_path).stem}", file_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module.ARTIFACT
+    with rb_util._tmp_copy_on_open(file_path) as tmp_file:
+        with open(tmp_file, "r") as f:
+            return json.load(f)
+
+
+def load_artifact(file_path: str, config_class: Optional[Type[BaseConfig]] = None) -> BaseConfig:
+    """Loads a compiled config created by `build_artifact`, without revalidating it.
+
+    Args:
+        file_path: the path to a '.rbc' or '.py' compiled config
+        config_class:
+            the expected (entrypoint) config class. If given, the artifact is checked against its schema
+            fingerprint s.t. artifacts built from out-of-date config classes are rejected.
+    """
+    artifact = _read_artifact(file_path)
+    if artifact.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        raise ArtifactException(f"'{file_path}' is not a compiled config (or was built by an incompatible redband)")
+    fingerprint = schema_fingerprint(config_class, artifact["config"]) if config_class is not None else None
+    if fingerprint is not None and fingerprint != artifact["schema_fingerprint"]:
+        raise ArtifactException(
+            f"The compiled config '{file_path}' was built for a different version of '{config_class.__name__}' "
+            "(its fields have changed since), please rebuild it with `redband build`"
+        )
+    return config_from_payload(artifact["config"], config_class=config_class, validate=False)
@@ -1,10 +1,12 @@
+import copy
 import inspect
 from _collections_abc import dict_keys
-from typing import AbstractSet, Any, Dict, List, Mapping, Optional, Union
+from typing import AbstractSet, Any, Dict, List, Mapping, Optional, Type, Union
 
 from pydantic.error_wrappers import ValidationError
 from pydantic.fields import ModelField
 from pydantic_yaml import YamlModel as BaseModel
+from redband.constants import InstanceScope
 from redband.typing import DictStrAny
 
 from redband.util import load_yaml, save_yaml
@@ -55,30 +57,50 @@ class BaseConfig(BaseModel):
         cls.__fields__.update(new_fields)
         cls.__annotations__.update(new_annotations)
 
+    @classmethod
+    def _copy(cls) -> Type["BaseConfig"]:
+        """Returns a private copy of this config class with its own `__fields__` (pydantic deep-copies the
+        fields of a base class), s.t. the copy can be mutated during composition (by `_add_fields` and
+        `_set_param`) without affecting the original class or any other composition running concurrently.
+
+        NB: only the entrypoint config class is copied, as sub-config classes (& the instances that are the defaults
+        of sub-config fields) are never mutated during composition: `redband.merge` builds new sub-config instances.
+        """
+        return type(
+            cls.__name__,
+            (cls,),
+            {
+                "__module__": cls.__module__,
+                "__qualname__": cls.__qualname__,
+                "__annotations__": {},
+                "__redband_copy_of__": cls,
+            },
+        )
+
+    @classmethod
+    def _is_copy(cls) -> bool:
+        return "__redband_copy_of__" in cls.__dict__
+
     @classmethod
     def _get_param(cls, param: str) -> str:
         return cls.__fields__[param].get_default()
 
     @classmethod
     def _set_param(cls, param_name: str, value: Any) -> None:
-        """"""
-
-        # TODO: if the param is a BaseConfig then value should NOT be a dict, it should be that config class type
-
+        """Sets the default of a parameter of this config class, inplace, after validating it against the type of
+        the parameter. NB: sub-config parameters must be set to config instances, not config dicts.
+        """
         old_field = cls.__fields__[param_name]
-        new_field = ModelField.infer(
-            name=param_name,
-            value=value,
-            annotation=old_field.type_,
-            class_validators=None,
-            config=cls.__config__,
-        )
+        # NB: the new field is a copy of the old one (rather than re-inferred from its `type_`) s.t. its full type is
+        # kept, e.g. `List[int]` or `Optional[float]`
+        new_field = copy.copy(old_field)
 
         # validate override that created the new field
-        _, error_ = new_field.validate(value, {}, loc=param_name)
+        value, error_ = new_field.validate(value, {}, loc=param_name)
         if error_:
             raise ValidationError([error_], cls)
 
+        new_field.default, new_field.default_factory, new_field.required = value, None, False
         cls.__fields__[param_name] = new_field
 
     @classmethod
@@ -97,6 +119,9 @@ class BaseConfig(BaseModel):
     def __getitem__(self, attr_name: str) -> Any:
         return getattr(self, attr_name)
 
+    def __contains__(self, attr_name: str) -> bool:
+        return attr_name in self.__fields__
+
     @property
     def keys(self) -> dict_keys:
         return self.dict().keys()
@@ -127,6 +152,14 @@ class InstantiableConfig(BaseConfig):
     target__: str
     partial__: bool = False
 
+    # lifetime of the object created by redband.instantiate: 'per_call' builds a new object every time,
+    # whereas 'singleton' and 'per_process' share one object between all structurally identical configs
+    scope__: InstanceScope = InstanceScope.PER_CALL.value
+
+    class Config:
+        # store scopes as plain strings s.t. configs can still be dumped to YAML
+        use_enum_values = True
+
     # TODO: add `instantiate` method
 
 
@@ -155,8 +188,9 @@ def is_target_node(node: Any) -> bool:
 
 
 def is_dict_config(node: Any) -> bool:
-    return is_config_node(node)
+    return isinstance(node, BaseConfig)
 
 
 def is_list_config(node: Any) -> bool:
-    return isinstance(node, ListConfig)
+    # NB: list fields of config instances are plain lists
+    return isinstance(node, ListConfig) or (isinstance(node, list) and any(isinstance(n, BaseConfig) for n in node))
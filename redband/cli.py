@@ -55,12 +55,35 @@ def get_args_parser() -> argparse.ArgumentParser:
         default=os.getenv("RB_CONFIG_LIB_DIR"),
     )
 
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        default=False,
+        help="Report the memory allocated & retained by config composition (to stderr)",
+    )
+
+    parser.add_argument(
+        "--complete",
+        metavar="WORD",
+        help="Print the completions of a partial override (used by shell tab-completion) and exit",
+    )
+
+    parser.add_argument(
+        "--shell-completion",
+        choices=["bash"],
+        help=(
+            "Print a script that enables tab-completion of overrides, "
+            "e.g. `source <(python app.py --shell-completion bash)`"
+        ),
+    )
+
     parser.add_argument(
         "--config",
         "-c",
         help=(
             "Runs the entrypoint with a serialized config object, bypassing all config composition "
-            "(all other command-line arguments are ignored)"
+            "(all other command-line arguments are ignored). This can be a YAML saved with `config.save` "
+            "or a compiled config ('.rbc' or '.py') built with `redband build`, which isn't revalidated"
         ),
     )
 
@@ -10,3 +10,18 @@ class SpecialKeys(enum.Enum):
     TARGET = "target__"
     PARTIAL = "partial__"
     RECURSIVE = "recursive__"
+    SCOPE = "scope__"
+
+
+@enum.unique
+class InstanceScope(str, enum.Enum):
+    """Lifetime scopes for objects created by instantiate."""
+
+    # a new object is created on every call to instantiate (the default)
+    PER_CALL = "per_call"
+
+    # structurally identical configs share one object for as long as it's referenced elsewhere
+    SINGLETON = "singleton"
+
+    # structurally identical configs share one object for the lifetime of the current process
+    PER_PROCESS = "per_process"
@@ -0,0 +1,146 @@
+import gc
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Mapping, Optional
+
+from pydantic.fields import ModelField
+
+from redband.base import BaseConfig
+from redband.library import ConfigLibrary, get_config_library
+
+
+def _count_instances(cls: type) -> int:
+    """Counts the live (gc-tracked) instances of a class. This is slow, so only used for diagnostics."""
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, cls))
+
+
+def _count_config_classes(config_class: type = BaseConfig) -> int:
+    """Counts all (live) subclasses of a config class, including the private copies made during composition."""
+    return sum(1 + _count_config_classes(subclass) for subclass in config_class.__subclasses__())
+
+
+def _library_size(config_group: Mapping[str, Any]) -> int:
+    """Counts the configs in a (nested) config group of a ConfigLibrary."""
+    return sum(_library_size(v) if isinstance(v, Mapping) else 1 for v in config_group.values())
+
+
+class MemoryProfile(object):
+    """The memory footprint of a block of code profiled with `profile_memory`. All counts are deltas between
+    the start & end of the block, measured after garbage collection, so anything non-zero was _retained_.
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+        self.duration_s: float = 0.0
+        # net bytes allocated (& still held) within the block, and the peak traced memory during the block
+        self.allocated_bytes: int = 0
+        self.peak_bytes: int = 0
+        self.model_fields: int = 0
+        self.config_classes: int = 0
+        self.config_instances: int = 0
+        # the number of configs in the ConfigLibrary at the end of the block, & how many were added
+        self.library_size: int = 0
+        self.library_growth: int = 0
+        self.top_allocations: List[str] = []
+
+    def __str__(self) -> str:
+        lines = [
+            f"[redband] memory profile: {self.label} ({self.duration_s * 1000:.1f}ms)",
+            f"  allocated (retained): {self.allocated_bytes / 1024:.1f} KiB",
+            f"  peak traced:          {self.peak_bytes / 1024:.1f} KiB",
+            f"  ModelFields:          {self.model_fields:+d}",
+            f"  config classes:       {self.config_classes:+d}",
+            f"  config instances:     {self.config_instances:+d}",
+            f"  library size:         {self.library_size} ({self.library_growth:+d})",
+        ]
+        if self.top_allocations:
+            lines.append("  top allocations:")
+            lines.extend(f"    {allocation}" for allocation in self.top_allocations)
+        return "\n".join(lines)
+
+
+@contextmanager
+def profile_memory(
+    label: str = "",
+    config_lib: Optional[ConfigLibrary] = None,
+    n_top_allocations: int = 5,
+) -> Iterator[MemoryProfile]:
+    """Profiles the memory allocated & retained by composition or instantiation, using tracemalloc snapshots.
+    The returned profile is filled in when the block exits. Usage:
+        with profile_memory("instantiate") as profile:
+            model = redband.instantiate(config.model)
+        print(profile)
+
+    NB: this is slow (it garbage collects & walks all gc-tracked objects), so should only be used for debugging.
+
+    Args:
+        label: a name for the profiled block, used when printing the profile
+        config_lib: the library whose size to track (defaults to the process-wide library)
+        n_top_allocations: the number of source lines with the largest net allocations to report
+    """
+    config_lib = config_lib if config_lib is not None else get_config_library()
+    profile = MemoryProfile(label)
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    elif hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+
+    gc.collect()
+    snapshot_before = tracemalloc.take_snapshot()
+    model_fields_before = _count_instances(ModelField)
+    config_classes_before = _count_config_classes()
+    config_instances_before = _count_instances(BaseConfig)
+    library_size_before = _library_size(config_lib.configs)
+    start_time = time.perf_counter()
+
+    try:
+        yield profile
+    finally:
+        profile.duration_s = time.perf_counter() - start_time
+        gc.collect()
+        snapshot_after = tracemalloc.take_snapshot()
+        profile.peak_bytes = tracemalloc.get_traced_memory()[1]
+        if started_tracing:
+            tracemalloc.stop()
+
+        # ignore the allocations made by tracemalloc itself
+        snapshot_filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        stats = snapshot_after.filter_traces(snapshot_filters).compare_to(
+            snapshot_before.filter_traces(snapshot_filters), "lineno"
+        )
+        profile.allocated_bytes = sum(stat.size_diff for stat in stats)
+        profile.top_allocations = [str(stat) for stat in stats[:n_top_allocations] if stat.size_diff > 0]
+
+        profile.model_fields = _count_instances(ModelField) - model_fields_before
+        profile.config_classes = _count_config_classes() - config_classes_before
+        profile.config_instances = _count_instances(BaseConfig) - config_instances_before
+        profile.library_size = _library_size(config_lib.configs)
+        profile.library_growth = profile.library_size - library_size_before
+
+
+def measure_memory_growth(func: Callable[[], Any], n_iterations: int = 100_000, n_warmup: int = 100) -> int:
+    """Calls `func` repeatedly & returns the net number of bytes retained by the process in doing so (after
+    some warmup iterations to fill any caches). Used to check that repeated composition or instantiation
+    doesn't leak, e.g.
+        assert measure_memory_growth(lambda: _compose(cli_args, my_entrypoint)) < 1024 * 1024
+    """
+    for _ in range(n_warmup):
+        func()
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        gc.collect()
+        traced_before, _ = tracemalloc.get_traced_memory()
+        for _ in range(n_iterations):
+            func()
+        gc.collect()
+        traced_after, _ = tracemalloc.get_traced_memory()
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    return traced_after - traced_before
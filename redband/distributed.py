@@ -0,0 +1,229 @@
+import json
+import os
+import socket
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional, Type
+
+from pydantic.json import pydantic_encoder
+
+from redband.base import BaseConfig
+from redband.serialization import config_from_payload, config_to_payload
+from redband.typing import DictStrAny
+
+# the standard environment variables set by distributed launchers (e.g. torchrun, SLURM wrappers)
+RANK_ENV_VAR = "RANK"
+WORLD_SIZE_ENV_VAR = "WORLD_SIZE"
+MASTER_ADDR_ENV_VAR = "MASTER_ADDR"
+MASTER_PORT_ENV_VAR = "MASTER_PORT"
+
+# the port rank 0 broadcasts the composed config on, which defaults to one above MASTER_PORT s.t. it can't
+# clash with the launcher's own rendezvous (or to DEFAULT_BROADCAST_PORT if there's no MASTER_PORT)
+BROADCAST_PORT_ENV_VAR = "RB_BROADCAST_PORT"
+DEFAULT_BROADCAST_PORT = 29_401
+# a file on a file system shared by all ranks through which to broadcast instead of TCP. Rank 0 removes any
+# file left by a previous launch before composing, & ranks only accept a config from their own launch (see below)
+RENDEZVOUS_FILE_ENV_VAR = "RB_RENDEZVOUS_FILE"
+# identifies the launch (& restart) a config was broadcast for, which defaults to the IDs set by torchrun or SLURM.
+# One is required to broadcast through a rendezvous file, as other ranks could otherwise read a stale file before
+# rank 0 has removed it
+LAUNCH_ID_ENV_VAR = "RB_LAUNCH_ID"
+LAUNCHER_ID_ENV_VARS = [
+    ("TORCHELASTIC_RUN_ID", "TORCHELASTIC_RESTART_COUNT"),
+    ("SLURM_JOB_ID", "SLURM_RESTART_COUNT"),
+]
+# set to '0' to have every rank compose its own config
+DISTRIBUTED_ENV_VAR = "RB_DISTRIBUTED"
+# the number of seconds ranks wait for rank 0 to compose & broadcast the config
+BROADCAST_TIMEOUT_ENV_VAR = "RB_BROADCAST_TIMEOUT"
+DEFAULT_BROADCAST_TIMEOUT = 600.0
+
+
+class DistributedException(Exception):
+    ...
+
+
+class DistributedContext(NamedTuple):
+    rank: int
+    world_size: int
+    master_addr: Optional[str]
+    port: int
+    rendezvous_file: Optional[str]
+    launch_id: Optional[str]
+    timeout: float
+
+
+def _get_launch_id() -> Optional[str]:
+    if LAUNCH_ID_ENV_VAR in os.environ:
+        return os.environ[LAUNCH_ID_ENV_VAR]
+    for run_id_env_var, restart_count_env_var in LAUNCHER_ID_ENV_VARS:
+        if run_id_env_var in os.environ:
+            return f"{os.environ[run_id_env_var]}.{os.getenv(restart_count_env_var, '0')}"
+    return None
+
+
+def get_distributed_context() -> Optional[DistributedContext]:
+    """Reads the distributed launch this process is part of from the environment, returning None if it isn't
+    part of one (or distributed composition has been disabled).
+    """
+    world_size = int(os.getenv(WORLD_SIZE_ENV_VAR, "1"))
+    if world_size <= 1 or os.getenv(DISTRIBUTED_ENV_VAR, "1") == "0":
+        return None
+
+    if RANK_ENV_VAR not in os.environ:
+        raise DistributedException(f"'{WORLD_SIZE_ENV_VAR}' is set but '{RANK_ENV_VAR}' isn't")
+    rendezvous_file = os.getenv(RENDEZVOUS_FILE_ENV_VAR)
+    master_addr = os.getenv(MASTER_ADDR_ENV_VAR)
+    if master_addr is None and rendezvous_file is None:
+        raise DistributedException(
+            f"Distributed composition requires either '{MASTER_ADDR_ENV_VAR}' or '{RENDEZVOUS_FILE_ENV_VAR}' to be set"
+        )
+
+    launch_id = _get_launch_id()
+    if rendezvous_file is not None and launch_id is None:
+        raise DistributedException(
+            f"Broadcasting through '{RENDEZVOUS_FILE_ENV_VAR}' requires a launch ID, please set '{LAUNCH_ID_ENV_VAR}' "
+            "to a value unique to each launch (e.g. a job ID)"
+        )
+
+    port = os.getenv(BROADCAST_PORT_ENV_VAR)
+    if port is None:
+        master_port = os.getenv(MASTER_PORT_ENV_VAR)
+        port = int(master_port) + 1 if master_port is not None else DEFAULT_BROADCAST_PORT
+
+    rank = int(os.environ[RANK_ENV_VAR])
+    assert 0 <= rank < world_size, f"'{RANK_ENV_VAR}' must be in [0, {world_size})"
+    return DistributedContext(
+        rank=rank,
+        world_size=world_size,
+        master_addr=master_addr,
+        port=int(port),
+        rendezvous_file=rendezvous_file,
+        launch_id=launch_id,
+        timeout=float(os.getenv(BROADCAST_TIMEOUT_ENV_VAR, DEFAULT_BROADCAST_TIMEOUT)),
+    )
+
+
+class ConfigBroadcast(object):
+    """Broadcasts the config composed by rank 0 to all other ranks (see `receive_config`), as a single line of
+    JSON: `{"launch_id": <ID>, "config": <payload>}` or, if composition failed, `{"launch_id": <ID>, "error":
+    <message>}` s.t. other ranks fail fast rather than waiting out the timeout.
+
+    Use as a context manager around composition: over TCP the socket is bound on entry s.t. other ranks can
+    connect while rank 0 is still composing, while a rendezvous file left by a previous launch is removed on
+    entry. An error is broadcast on exit if no config was sent.
+
+    ```
+        with ConfigBroadcast(context) as broadcast:
+            broadcast.send(compose())
+    ```
+    """
+
+    def __init__(self, context: DistributedContext):
+        assert context.rank == 0, "Only rank 0 broadcasts its config"
+        self.context = context
+        self.sent = False
+        self._server_socket: Optional[socket.socket] = None
+
+    def __enter__(self) -> "ConfigBroadcast":
+        if self.context.rendezvous_file is not None:
+            try:
+                os.remove(self.context.rendezvous_file)
+            except FileNotFoundError:
+                pass
+        else:
+            self._server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._server_socket.bind(("", self.context.port))
+            self._server_socket.listen(self.context.world_size)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            if exc_value is not None and not self.sent:
+                self._broadcast({"error": f"{type(exc_value).__name__}: {exc_value}"})
+        # NB: the composition error is more useful than failing to broadcast it
+        except (DistributedException, OSError):
+            pass
+        finally:
+            if self._server_socket is not None:
+                self._server_socket.close()
+
+    def send(self, config: BaseConfig) -> None:
+        assert not self.sent, "The config has already been broadcast"
+        self._broadcast({"config": config_to_payload(config)})
+
+    def _broadcast(self, message: DictStrAny) -> None:
+        message = {"launch_id": self.context.launch_id, **message}
+        message_bytes = json.dumps(message, default=pydantic_encoder, separators=(",", ":")).encode("utf-8") + b"\n"
+        self.sent = True
+
+        if self.context.rendezvous_file is not None:
+            rendezvous_file = Path(self.context.rendezvous_file)
+            tmp_rendezvous_file = rendezvous_file.with_name(f".{rendezvous_file.name}.{os.getpid()}.tmp")
+            tmp_rendezvous_file.write_bytes(message_bytes)
+            # NB: the rename is atomic s.t. other ranks never read a partially written config
+            os.replace(tmp_rendezvous_file, rendezvous_file)
+            return
+
+        self._server_socket.settimeout(self.context.timeout)
+        for _ in range(self.context.world_size - 1):
+            try:
+                connection, _ = self._server_socket.accept()
+            except socket.timeout as e:
+                raise DistributedException(
+                    f"Not all ranks connected to receive the config within {self.context.timeout}s"
+                ) from e
+            with connection:
+                connection.sendall(message_bytes)
+
+
+def _receive_tcp(context: DistributedContext) -> bytes:
+    deadline = time.monotonic() + context.timeout
+    while True:
+        try:
+            with socket.create_connection((context.master_addr, context.port), timeout=context.timeout) as sock:
+                with sock.makefile("rb") as f:
+                    message_bytes = f.readline()
+            # rank 0 closes the connection only after sending the whole message
+            if message_bytes.endswith(b"\n"):
+                return message_bytes
+        except OSError:
+            # rank 0 isn't listening yet
+            pass
+        if time.monotonic() > deadline:
+            raise DistributedException(
+                f"Rank {context.rank} didn't receive the config from rank 0 at "
+                f"'{context.master_addr}:{context.port}' within {context.timeout}s"
+            )
+        time.sleep(0.1)
+
+
+def _receive_file(context: DistributedContext) -> bytes:
+    deadline = time.monotonic() + context.timeout
+    while True:
+        try:
+            message_bytes = Path(context.rendezvous_file).read_bytes()
+            # NB: a file with another launch ID was left by a previous launch (& rank 0 is yet to remove it)
+            if json.loads(message_bytes).get("launch_id") == context.launch_id:
+                return message_bytes
+        except FileNotFoundError:
+            pass
+        if time.monotonic() > deadline:
+            raise DistributedException(
+                f"Rank {context.rank} didn't find the config of launch '{context.launch_id}' at "
+                f"'{context.rendezvous_file}' within {context.timeout}s"
+            )
+        time.sleep(0.1)
+
+
+def receive_config(context: DistributedContext, config_class: Optional[Type[BaseConfig]] = None) -> BaseConfig:
+    """Receives the config broadcast by rank 0 (see `ConfigBroadcast`). The config is only deserialized,
+    without validation, as rank 0 has already validated it.
+    """
+    assert context.rank != 0, "Rank 0 composes (& broadcasts) its own config"
+    message_bytes = _receive_file(context) if context.rendezvous_file is not None else _receive_tcp(context)
+    message = json.loads(message_bytes)
+    if "error" in message:
+        raise DistributedException(f"Rank 0 failed to compose the config: {message['error']}")
+    return config_from_payload(message["config"], config_class=config_class, validate=False)
@@ -1,14 +1,31 @@
 import argparse
 import functools
 import inspect
+import os
 import re
+import sys
+from contextlib import nullcontext
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
 
+from redband.artifact import is_artifact_path, load_artifact
 from redband.base import BaseConfig, EntrypointConfig, is_config_node
 from redband.cli import get_args_parser
-from redband.library import ConfigLibrary, fill_config_library
-from redband.merge import merge
+from redband.diagnostics import profile_memory
+from redband.distributed import ConfigBroadcast, get_distributed_context, receive_config
+from redband.library import ConfigLibrary, fill_config_library, get_config_library
+from redband.merge import merge, SELECTED_CONFIG_KEY
+from redband.overrides import (
+    _get_config_field_class,
+    apply_deletions,
+    coerce_overrides,
+    get_group_selections,
+    Override,
+    parse_overrides,
+)
+from redband.schema import bash_completion_script, complete, format_help, get_schema_index
+from redband.serialization import config_from_payload
+from redband.server import compose_remote, COMPOSE_SERVER_ENV_VAR, ComposeServerException
 from redband.typing import ConfigFields, DictStrAny, JSON
 from redband import util as rb_util
 
@@ -64,6 +81,15 @@ def _get_yaml_name(entrypoint_yaml_name: Optional[str], cli_yaml_name: Optional[
         return yaml_name
 
 
+def _get_entrypoint_config_class(entrypoint_func: EntrypointFunc) -> Type[BaseConfig]:
+    """Returns the entrypoint config class, based on the type annotation of the entrypoint function."""
+    entrypoint_func_signature = inspect.signature(entrypoint_func)
+    assert (
+        len(entrypoint_func_signature.parameters) == 1
+    ), "Your decorated entrypoint function should expect only a single argument, the resolved config object"
+    return list(entrypoint_func_signature.parameters.values())[0].annotation
+
+
 def _validate_config_dict(node: Union[Any, Type[BaseConfig], ConfigDict]) -> ConfigDict:
     """TODO: docstring + get rid of Any in annotation (I need something)"""
 
@@ -80,17 +106,23 @@ def _validate_config_dict(node: Union[Any, Type[BaseConfig], ConfigDict]) -> Con
         return node
 
 
-def _compose_config_dict(entrypoint_config_class_fields: ConfigFields, config_dict: DictStrAny) -> DictStrAny:
+def _compose_config_dict(
+    entrypoint_config_class_fields: ConfigFields,
+    config_dict: DictStrAny,
+    config_lib: Optional[ConfigLibrary] = None,
+) -> DictStrAny:
     """TODO: documentation + ConfigCompositionException etc."""
 
-    config_lib: ConfigLibrary = ConfigLibrary()
+    config_lib = config_lib if config_lib is not None else get_config_library()
     composed_config_dict = {}
 
     for key, value in config_dict.items():
 
         entrypoint_key, *nested_keys = key.split(".")
         _cur_key, _cur_dict = entrypoint_key, composed_config_dict
-        config_field_type: Type[BaseConfig] = entrypoint_config_class_fields[_cur_key].type_
+        # NB: keys added with a '+' override are not fields of the entrypoint config
+        config_field = entrypoint_config_class_fields.get(_cur_key)
+        config_field_type = _get_config_field_class(config_field) if config_field is not None else None
 
         for sub_key in nested_keys:
 
@@ -100,30 +132,26 @@ def _compose_config_dict(entrypoint_config_class_fields: ConfigFields, config_di
             _cur_dict = _cur_dict[_cur_key]
             _cur_key = sub_key
 
-            # set type of potential sub-config
-            # TODO: check that I'm doing this right, potentially should be _cur_key not sub_key
-            if is_config_node(config_field_type):
-                nested_param = config_field_type._get_param(sub_key)
-                if is_config_node(nested_param):
-                    config_field_type: Type[BaseConfig] = nested_param
-                else:
-                    config_field_type = None
+            # set type of potential sub-config (of the config selected for this key, if any)
+            config_field_type = _cur_dict.get(SELECTED_CONFIG_KEY, config_field_type)
+            if is_config_node(config_field_type) and sub_key in config_field_type.__fields__:
+                config_field_type = _get_config_field_class(config_field_type.__fields__[sub_key])
+            else:
+                config_field_type = None
 
-        # fill value in depending on whether new node is a sub-config or a parameter
-        if is_config_node(config_field_type):
+        # fill value in depending on whether new node is a sub-config selection or a parameter (or config dict)
+        if is_config_node(config_field_type) and isinstance(value, str):
             config_group = config_lib.get_config_group(config_field_type._group())
-            value = config_group[value]._to_config_dict()
+            # NB: values for the selected config may already have been set by nested keys
+            nested_config_dict = _cur_dict[_cur_key] if isinstance(_cur_dict.get(_cur_key), dict) else {}
+            value = {**nested_config_dict, SELECTED_CONFIG_KEY: config_group[value]}
         _cur_dict[_cur_key] = value
 
     return composed_config_dict
 
 
-def _compose_yaml(
-    entrypoint_config_class_fields: ConfigFields,
-    yaml_dir: str,
-    yaml_name: Optional[str] = None,
-) -> ConfigDict:
-    """#TODO: docstring"""
+def _load_yaml(yaml_dir: str, yaml_name: Optional[str] = None) -> ConfigDict:
+    """Loads the (uncomposed) entrypoint config dict from the entrypoint YAML."""
 
     # if the user didn't specify a YAML, return empty
     if yaml_name is None:
@@ -133,27 +161,41 @@ def _compose_yaml(
     # find YAML & load —> JSON dict
     valid_yamls = sorted(Path(yaml_dir).glob(f"{yaml_name}.y*ml"))
     assert len(valid_yamls) == 1, "There is more than one matching YAML in your specified `yaml_path`"
-    yaml_dict: Dict[str, JSON] = rb_util.load_yaml(str(valid_yamls[0]))
+    yaml_dict: Dict[str, JSON] = rb_util.load_yaml_cached(str(valid_yamls[0]))
+    return yaml_dict.get("entrypoint") or {}
 
-    return _compose_config_dict(entrypoint_config_class_fields, yaml_dict.get("entrypoint"))
+
+def _compose_yaml(
+    entrypoint_config_class_fields: ConfigFields,
+    yaml_config_dict: ConfigDict,
+    config_lib: Optional[ConfigLibrary] = None,
+) -> ConfigDict:
+    """#TODO: docstring"""
+    return _compose_config_dict(entrypoint_config_class_fields, yaml_config_dict, config_lib=config_lib)
 
 
-def _compose_overrides(entrypoint_config_class_fields: ConfigFields, overrides: List[str]) -> DictStrAny:
+def _compose_overrides(
+    entrypoint_config_class: Type[BaseConfig],
+    overrides: List[Override],
+    config_lib: Optional[ConfigLibrary] = None,
+    selected_classes: Optional[Dict[str, Type[BaseConfig]]] = None,
+) -> DictStrAny:
     """Constructs a config dict from the command-line overrides. These configs will be merged into the
     final config object _last_ meaning they take precedence over the values defined in config classes in
     code and the values defined in the entrypoint YAML.
 
     Args:
-        entrypoint_config_class_fields:
-            the fields of the entrypoint config (for finding the correct config groups in the ConfigLibrary)
-        overrides: the list of string overrides as parsed by `cli.py`
+        entrypoint_config_class:
+            the entrypoint config class (for coercing override values to the type of the field they override
+            and finding the correct config groups in the ConfigLibrary)
+        overrides: the overrides parsed from the command-line, see `redband.overrides.parse_override`
+        config_lib: the library in which to find config groups (defaults to the process-wide library)
+        selected_classes: configs selected for sub-config fields by the entrypoint YAML, see `coerce_overrides`
     """
-    config_dict = {}
-    for override_str in overrides:
-        assert override_str.count("=") == 1, "Your command-line overrides must be of the form '<key>=<value>'"
-        key, value = override_str.split("=")
-        config_dict[key] = value
-    return _compose_config_dict(entrypoint_config_class_fields, config_dict)
+    config_dict = coerce_overrides(
+        entrypoint_config_class, overrides, config_lib=config_lib, selected_classes=selected_classes
+    )
+    return _compose_config_dict(entrypoint_config_class.__fields__, config_dict, config_lib=config_lib)
 
 
 def _compose(
@@ -162,6 +204,7 @@ def _compose(
     entrypoint_yaml_name: Optional[str] = None,
     entrypoint_yaml_path: Optional[str] = None,
     config_lib_dir: Optional[str] = None,
+    config_lib: Optional[ConfigLibrary] = None,
 ) -> Type[BaseConfig]:
     """This function
         1) composes an entrypoint config based on a combination of the config classes defined by the user,
@@ -178,37 +221,51 @@ def _compose(
         config_lib_dir:
             an optional path to the directory in which the user defined their configs,
             specified as an argument to the entrypoint decorator
+        config_lib:
+            an optional ConfigLibrary to compose with (& fill if necessary), instead of the process-wide library
 
     Returns the composed, validated config: an instantiated instance of a BaseConfig subclass
     """
 
     entrypoint_file_path = inspect.getfile(entrypoint_func)
 
-    # find all user configs & construct the Singleton ConfigLibrary
-    fill_config_library(entrypoint_file_path, cli_args.config_lib_dir or config_lib_dir)
+    # find all user configs & add them to the ConfigLibrary (if they haven't been already)
+    config_lib = fill_config_library(entrypoint_file_path, cli_args.config_lib_dir or config_lib_dir, config_lib)
 
     # find the entrypoint config type based on the users type annotation + set 'entrypoint' group
-    entrypoint_func_signature = inspect.signature(entrypoint_func)
-    assert (
-        len(entrypoint_func_signature.parameters) == 1
-    ), "Your decorated entrypoint function should expect only a single argument, the resolved config object"
-    entrypoint_config_class: Type[BaseConfig] = list(entrypoint_func_signature.parameters.values())[0].annotation
-    if not isinstance(entrypoint_config_class, EntrypointConfig):
+    user_entrypoint_config_class = _get_entrypoint_config_class(entrypoint_func)
+
+    # composition mutates the entrypoint config class, so we compose on a private copy of the user's class
+    # s.t. concurrent compositions (or repeated compositions in one process) can't interfere with one another
+    entrypoint_config_class = user_entrypoint_config_class._copy()
+    if not issubclass(entrypoint_config_class, EntrypointConfig):
         entrypoint_config_class._add_fields(group__=(str, "entrypoint"))
     entrypoint_config_class_fields = entrypoint_config_class.__fields__
 
-    # compose overrides into a config_dict
-    overrides_config_dict = _compose_overrides(entrypoint_config_class_fields, cli_args.overrides)
+    # parse, validate, & compose overrides into a config_dict (before any merging s.t. errors surface early)
+    # NB: coercers are derived from (& cached on) the user's class rather than the per-composition copy
+    overrides = parse_overrides(cli_args.overrides)
 
     # if we were passed a config, compose that directly (with optional overrides) and return, ignoring other cli_args
     if cli_args.config is not None:
-        return merge(entrypoint_config_class.load(cli_args.config), overrides_config_dict)
+        overrides_config_dict = _compose_overrides(user_entrypoint_config_class, overrides, config_lib=config_lib)
+        return _to_user_config(merge(entrypoint_config_class.load(cli_args.config), overrides_config_dict))
 
-    # work out entrypoint YAML dir and name &, if necessary, resolve the YAML config
+    # work out entrypoint YAML dir and name &, if necessary, load the YAML config
     yaml_name = entrypoint_yaml_name
     yaml_dir, _yaml_name = _get_yaml_dir_and_name(entrypoint_file_path, entrypoint_yaml_path, cli_args.yaml_path)
     yaml_name = yaml_name or _yaml_name or _get_yaml_name(entrypoint_yaml_name, cli_args.yaml_name)
-    yaml_config_dict = _compose_yaml(entrypoint_config_class_fields, yaml_dir, yaml_name)
+    yaml_config_dict = _load_yaml(yaml_dir, yaml_name)
+
+    # overrides of sub-configs selected in the YAML are checked against the selected config (e.g. `optimizer: sgd`
+    # in the YAML & `optimizer.momentum=0.9` on the command-line)
+    yaml_selections = get_group_selections(user_entrypoint_config_class, yaml_config_dict, config_lib=config_lib)
+    overrides_config_dict = _compose_overrides(
+        user_entrypoint_config_class, overrides, config_lib=config_lib, selected_classes=yaml_selections
+    )
+
+    yaml_config_dict = _compose_yaml(entrypoint_config_class_fields, yaml_config_dict, config_lib=config_lib)
+    yaml_config_dict = apply_deletions(yaml_config_dict, overrides)
 
     # merge entrypoint YAML and overrides config dicts with the entrypoint config class, & validate
     entrypoint_config_class = merge(entrypoint_config_class, yaml_config_dict)
@@ -217,7 +274,54 @@ def _compose(
     # config_dict = _validate_config_dict(config_dict)
     # entrypoint_config = entrypoint_config_class(**config_dict)
 
-    return entrypoint_config
+    return _to_user_config(entrypoint_config)
+
+
+def _to_user_config(config: BaseConfig) -> BaseConfig:
+    """Rebuilds a (validated) config composed on a private copy of the user's config class (see `_compose`) as an
+    instance of the user's class itself, s.t. it can be pickled (e.g. sent to process pool workers).
+    """
+    config_class = type(config)
+    if not config_class._is_copy():
+        return config
+    return config_class.__redband_copy_of__.construct(_fields_set=config.__fields_set__, **config.__dict__)
+
+
+def _get_schema_index(
+    entrypoint_func: EntrypointFunc,
+    config_lib_dir: Optional[str] = None,
+    config_lib: Optional[ConfigLibrary] = None,
+) -> DictStrAny:
+    """Returns the (cached) schema index of the entrypoint config, see `redband.schema`. The ConfigLibrary is
+    only filled if the cached index is missing or out of date.
+    """
+    entrypoint_file_path = inspect.getfile(entrypoint_func)
+    return get_schema_index(
+        _get_entrypoint_config_class(entrypoint_func),
+        config_lib_dir,
+        lambda: fill_config_library(entrypoint_file_path, config_lib_dir, config_lib),
+    )
+
+
+def _compose_with_server(socket_path: str, entrypoint_func: EntrypointFunc) -> Optional[BaseConfig]:
+    """Composes the entrypoint config via a compose server (see `redband.server`), skipping all local composition.
+    Returns None if the server can't be reached s.t. the caller can fall back to composing locally.
+    """
+    try:
+        config_payload = compose_remote(
+            inspect.getfile(entrypoint_func), entrypoint_func.__name__, sys.argv[1:], socket_path=socket_path
+        )
+    except OSError as e:
+        print(
+            f"[redband] could not reach the compose server at '{socket_path}' ({e}), composing locally", file=sys.stderr
+        )
+        return None
+    except ComposeServerException as e:
+        raise ConfigCompositionException(str(e)) from e
+
+    # the server has already validated the config so there's no need to do so again
+    entrypoint_config_class = _get_entrypoint_config_class(entrypoint_func)
+    return config_from_payload(config_payload, config_class=entrypoint_config_class, validate=False)
 
 
 def entrypoint(
@@ -225,6 +329,7 @@ def entrypoint(
     yaml_name: Optional[str] = None,
     yaml_path: Optional[str] = None,
     config_lib_dir: Optional[str] = None,
+    config_lib: Optional[ConfigLibrary] = None,
 ) -> Callable[[EntrypointFunc], Any]:
     """This decorator adds Redband's core functionality to any Python script. By decorating your entrypoint
     function with with this decorator you specify that said function expects a single argument: the composed
@@ -260,6 +365,9 @@ def entrypoint(
         config_lib_dir:
             the directory in which your config classes are defined. This can also be handled via setting
             the 'RB_CONFIG_LIB_DIR' environment variable or using the `--config-lib-dir` command-line option
+        config_lib:
+            an optional ConfigLibrary to compose configs from, instead of the process-wide default library
+            (e.g. a pre-built library from `redband.library.build_config_library`)
     """
 
     # validate that arguments are formatted correctly
@@ -280,24 +388,75 @@ def entrypoint(
         @functools.wraps(entrypoint_func)
         def decorated_entrypoint(config_passthrough: Optional[BaseConfig] = None) -> Any:
             if config_passthrough is not None:
-                config = config_passthrough
-            else:
-                # compose a config object from the entrypoint_config_type base class, the entrypoint
+                return entrypoint_func(config_passthrough)
+
+            cli_args = get_args_parser().parse_args()
+            config = None
+
+            # help & tab-completion are served from the schema index, without composing a config
+            if cli_args.redband_help:
+                get_args_parser().print_help()
+                return
+            if cli_args.shell_completion is not None:
+                print(bash_completion_script(sys.executable, inspect.getfile(entrypoint_func)), end="")
+                return
+            if cli_args.help or cli_args.complete is not None:
+                schema_index = _get_schema_index(entrypoint_func, cli_args.config_lib_dir or config_lib_dir, config_lib)
+                if cli_args.help:
+                    print(format_help(schema_index, prog=Path(sys.argv[0]).name))
+                else:
+                    print("\n".join(complete(schema_index, cli_args.complete)))
+                return
+
+            # in distributed launches only rank 0 composes, every other rank receives the config it broadcasts
+            distributed_context = get_distributed_context()
+            if distributed_context is not None and distributed_context.rank != 0:
+                config = receive_config(distributed_context, config_class=_get_entrypoint_config_class(entrypoint_func))
+            broadcast_context = ConfigBroadcast(distributed_context) if config is None and distributed_context else None
+
+            with broadcast_context or nullcontext() as broadcast:
+                # compiled configs (see `redband build`) are loaded as-is, bypassing composition & validation entirely
+                if config is None and cli_args.config is not None and is_artifact_path(cli_args.config):
+                    assert not cli_args.overrides, "Compiled configs can't be overridden, rebuild them instead"
+                    config = load_artifact(cli_args.config, config_class=_get_entrypoint_config_class(entrypoint_func))
+
+                # compose via a compose server, if one has been configured
+                socket_path = os.getenv(COMPOSE_SERVER_ENV_VAR)
+                if config is None and socket_path and cli_args.config is None and not cli_args.profile_memory:
+                    config = _compose_with_server(socket_path, entrypoint_func)
+
+                # otherwise compose a config object from the entrypoint_config_type base class, the entrypoint
                 # YAML, and any command-line overrides
-                cli_args = get_args_parser().parse_args()
-                config = _compose(
-                    cli_args,
-                    entrypoint_func=entrypoint_func,
-                    entrypoint_yaml_name=yaml_name,
-                    entrypoint_yaml_path=yaml_path,
-                    config_lib_dir=config_lib_dir,
-                )
+                if config is None:
+                    profile_context = (
+                        profile_memory("compose", config_lib=config_lib) if cli_args.profile_memory else None
+                    )
+                    with profile_context or nullcontext() as profile:
+                        config = _compose(
+                            cli_args,
+                            entrypoint_func=entrypoint_func,
+                            entrypoint_yaml_name=yaml_name,
+                            entrypoint_yaml_path=yaml_path,
+                            config_lib_dir=config_lib_dir,
+                            config_lib=config_lib,
+                        )
+                    if profile is not None:
+                        print(profile, file=sys.stderr)
+
+                if broadcast is not None:
+                    broadcast.send(config)
 
             if cli_args.show:
                 print(config.yaml())
             else:
-                entrypoint_func(config)
-
+                return entrypoint_func(config)
+
+        # record the decorator arguments s.t. a compose server can compose on behalf of this entrypoint
+        decorated_entrypoint.__redband_entrypoint__ = {
+            "yaml_name": yaml_name,
+            "yaml_path": yaml_path,
+            "config_lib_dir": config_lib_dir,
+        }
         return decorated_entrypoint
 
     return entrypoint_decorator if _entrypoint_func is None else entrypoint_decorator(_entrypoint_func)
@@ -1,9 +1,15 @@
 import functools
+import hashlib
 import importlib
-from typing import Any, Callable, Optional, Union
+import os
+import threading
+import weakref
+from collections.abc import Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 from redband import base as rb_base
 
-from redband.constants import SpecialKeys
+from redband.constants import InstanceScope, SpecialKeys
 from redband.merge import merge
 
 
@@ -12,6 +18,117 @@ class InstantiationException(Exception):
 
 
 Target = Union[type, Callable[..., Any]]
+StructuralHash = Tuple[type, str]
+# the structural hash of a config & how it's instantiated (`lazy`, `read_ahead`), see `_instantiate_node`
+CacheKey = Tuple[type, str, bool, int]
+
+_MISSING = object()
+
+
+class _InstanceCache(object):
+    """Holds the objects created from configs with a `singleton` or `per_process` scope, keyed by
+    the structural hash of the config that created them (& whether it was instantiated lazily).
+
+    `singleton` objects are held by weak reference, so they are evicted as soon as nothing else refers
+    to them (objects that don't support weak references are held strongly until `clear`). `per_process`
+    objects are held strongly and are dropped whenever the cache is accessed from a forked child process.
+    Concurrent instantiations of the same config wait for the first one to finish rather than duplicating it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._weak: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self._strong: Dict[Tuple[InstanceScope, CacheKey], Any] = {}
+        # the lock of each key being instantiated & the number of threads using it, s.t. it can be dropped after
+        self._key_locks: Dict[Tuple[InstanceScope, CacheKey], Tuple[threading.Lock, int]] = {}
+
+    def _get(self, scope: InstanceScope, key: CacheKey) -> Tuple[bool, Any]:
+        for cache in [self._weak, self._strong]:
+            obj = cache.get((scope, key), _MISSING)
+            if obj is not _MISSING:
+                return True, obj
+        return False, None
+
+    def _set(self, scope: InstanceScope, key: CacheKey, obj: Any) -> None:
+        if scope == InstanceScope.SINGLETON:
+            try:
+                self._weak[(scope, key)] = obj
+                return
+            except TypeError:
+                # e.g. ints, lists, dicts can't be weakly referenced
+                pass
+        self._strong[(scope, key)] = obj
+
+    def get_or_create(self, scope: InstanceScope, key: CacheKey, create: Callable[[], Any]) -> Any:
+        """Returns the object cached for (`scope`, `key`), calling `create` to build it if there isn't one."""
+        with self._lock:
+            # locks (and objects) inherited from a parent process are not valid in a forked child
+            if self._pid != os.getpid():
+                self._reset()
+            key_lock, n_users = self._key_locks.get((scope, key), (threading.Lock(), 0))
+            self._key_locks[(scope, key)] = (key_lock, n_users + 1)
+
+        try:
+            with key_lock:
+                with self._lock:
+                    found, obj = self._get(scope, key)
+                if found:
+                    return obj
+                obj = create()
+                with self._lock:
+                    self._set(scope, key, obj)
+                return obj
+        finally:
+            self._release_key_lock(scope, key, key_lock)
+
+    def _release_key_lock(self, scope: InstanceScope, key: CacheKey, key_lock: threading.Lock) -> None:
+        """Drops the lock of a key once no thread is using it (s.t. evicted keys don't leave locks behind)."""
+        with self._lock:
+            # NB: the lock may have been dropped by `clear` (or a fork) in the meantime
+            cur_key_lock, n_users = self._key_locks.get((scope, key), (None, 0))
+            if cur_key_lock is not key_lock:
+                return
+            if n_users > 1:
+                self._key_locks[(scope, key)] = (key_lock, n_users - 1)
+            else:
+                del self._key_locks[(scope, key)]
+
+    def clear(self, scope: Optional[InstanceScope] = None) -> None:
+        """Evicts all cached objects, or only those of the given scope."""
+        with self._lock:
+            if scope is None:
+                self._reset()
+                return
+            for cache in [self._weak, self._strong, self._key_locks]:
+                for cache_key in [k for k in list(cache.keys()) if k[0] == scope]:
+                    cache.pop(cache_key, None)
+
+
+_instance_cache = _InstanceCache()
+
+
+def clear_instance_cache(scope: Optional[Union[InstanceScope, str]] = None) -> None:
+    """Explicitly evicts the objects shared between `singleton` and/or `per_process` scoped configs.
+
+    Args:
+        scope: the scope to evict, or None to evict everything
+    """
+    _instance_cache.clear(InstanceScope(scope) if scope is not None else None)
+
+
+def _structural_hash(node: rb_base.BaseConfig) -> Optional[StructuralHash]:
+    """Hashes a config by its type & contents s.t. separate but identical configs produce the same key.
+    Returns None if the config contains values that can't be serialized (& therefore can't be shared).
+    """
+    try:
+        node_json = node.json(sort_keys=True)
+    except (TypeError, ValueError):
+        return None
+    return type(node), hashlib.sha1(node_json.encode("utf-8")).hexdigest()
 
 
 def _convert_target_to_string(target: Target) -> str:
@@ -26,18 +143,120 @@ def _resolve_target(target_str: str, full_key: Optional[str] = None) -> Target:
         mod = importlib.import_module(modname)
         target = getattr(mod, classname)
     except Exception as e:
-        error_message = f"Error locating target '{target}', see chained exception above."
+        error_message = f"Error locating target '{target_str}', see chained exception above."
         if full_key is not None:
             error_message += f"\nfull_key: {full_key}"
         raise InstantiationException(error_message) from e
     return target
 
 
-def instantiate(config: rb_base.InstantiableConfig, *args: Any, **kwargs: Any) -> Any:
-    """TODO: documentation"""
+class LazySequence(Sequence):
+    """The result of lazily instantiating a list config: each element is instantiated from its config when it's
+    first accessed (& then cached). With `read_ahead > 0`, accessing element i also starts instantiating elements
+    i+1, ..., i+read_ahead on a thread pool, s.t. they're (partially) built by the time they're needed.
+
+    Concurrent accesses to the same element wait for a single instantiation. Exceptions raised instantiating
+    an element are re-raised whenever that element is accessed. The read-ahead thread pool is shut down by `close`,
+    on exiting a `with` block, or when the sequence is garbage collected.
+    """
+
+    def __init__(self, items: List[Any], instantiate_item: Callable[[Any], Any], read_ahead: int = 0):
+        self._items = items
+        self._instantiate_item = instantiate_item
+        self._read_ahead = read_ahead
+        self._futures: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=read_ahead) if read_ahead > 0 else None
+        self._finalizer = weakref.finalize(self, self._executor.shutdown, wait=False) if self._executor else None
+
+    def __enter__(self) -> "LazySequence":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("LazySequence index out of range")
+
+        future, run_here = self._get_future(index)
+        for i in range(index + 1, min(index + 1 + self._read_ahead, len(self))):
+            self._get_future(i, read_ahead=True)
+        if run_here:
+            self._run(index, future)
+        return future.result()
+
+    def stream(self) -> Iterator[Any]:
+        """Iterates over the instantiated elements without keeping them cached, s.t. each element can be freed
+        as soon as the consumer is done with it (accessing an element again instantiates it again).
+        """
+        for i in range(len(self)):
+            yield self[i]
+            with self._lock:
+                self._futures.pop(i, None)
+
+    def close(self) -> None:
+        """Stops read-ahead (elements that have already been scheduled are still instantiated)."""
+        with self._lock:
+            if self._executor is not None:
+                self._finalizer()
+                self._executor = None
+
+    def _get_future(self, index: int, read_ahead: bool = False) -> Tuple[Optional[Future], bool]:
+        """Returns the future of an element, scheduling its instantiation if it hasn't been already. Elements are
+        instantiated on the thread pool if there is one, otherwise the caller should run the instantiation itself
+        (elements are only read ahead if there is a thread pool, i.e. nothing is scheduled & None is returned).
+        """
+        with self._lock:
+            future = self._futures.get(index)
+            if future is not None:
+                return future, False
+            if read_ahead and self._executor is None:
+                return None, False
+            future = self._futures[index] = Future()
+            if self._executor is None:
+                return future, True
+            self._executor.submit(self._run, index, future)
+            return future, False
 
-    if config is None or not isinstance(config, rb_base.InstantiableConfig):
+    def _run(self, index: int, future: Future) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(self._instantiate_item(self._items[index]))
+        except BaseException as e:
+            future.set_exception(e)
+
+
+def instantiate(
+    config: Union[rb_base.BaseConfig, List[rb_base.BaseConfig]],
+    *args: Any,
+    lazy__: bool = False,
+    read_ahead__: int = 0,
+    **kwargs: Any,
+) -> Any:
+    """TODO: documentation
+
+    Args:
+        lazy__:
+            if True, list configs are instantiated to a `LazySequence` whose elements are only instantiated
+            when first accessed, rather than to a list of instantiated elements
+        read_ahead__:
+            the number of elements of each `LazySequence` to instantiate ahead of the element being accessed,
+            in background threads (s.t. consumers can start on the first elements while later ones are built)
+    """
+
+    if not rb_base.is_dict_config(config) and not rb_base.is_list_config(config):
         return config
+    if rb_base.is_list_config(config):
+        return _instantiate_node(config, *args, recursive=True, lazy=lazy__, read_ahead=read_ahead__)
 
     # TODO: do I want this function to handle config instances or instantiated configs ?
     # TODO: I guess _either_ would be useful, but for now I will assume instances
@@ -46,10 +265,13 @@ def instantiate(config: rb_base.InstantiableConfig, *args: Any, **kwargs: Any) -
     if kwargs:
         config = merge(config, kwargs)
 
-    recursive__ = config.pop(SpecialKeys.RECURSIVE)
-    partial__ = config.pop(SpecialKeys.PARTIAL)
+    # NB: special keys are read rather than popped s.t. the input config isn't mutated (& can be re-instantiated)
+    recursive__ = config[SpecialKeys.RECURSIVE.value]
+    partial__ = config[SpecialKeys.PARTIAL.value] if SpecialKeys.PARTIAL.value in config else False
 
-    return _instantiate_node(config, *args, recursive=recursive__, partial=partial__)
+    return _instantiate_node(
+        config, *args, recursive=recursive__, partial=partial__, lazy=lazy__, read_ahead=read_ahead__
+    )
 
 
 def _instantiate_node(
@@ -57,14 +279,19 @@ def _instantiate_node(
     *args: Any,
     recursive: bool = False,
     partial: bool = False,
+    lazy: bool = False,
+    read_ahead: int = 0,
 ) -> Any:
     """TODO: documentation"""
     # TODO: do I need to check for subclasses too ??
-    if not not isinstance(node, rb_base.BaseConfig) and not isinstance(node, rb_base.ListConfig):
+    if not rb_base.is_dict_config(node) and not rb_base.is_list_config(node):
         return node
 
-    recursive__ = node[SpecialKeys.RECURSIVE] if SpecialKeys.RECURSIVE in node else recursive
-    partial__ = node[SpecialKeys.PARTIAL] if SpecialKeys.PARTIAL in node else partial
+    recursive__ = recursive
+    partial__ = partial
+    if rb_base.is_dict_config(node):
+        recursive__ = node[SpecialKeys.RECURSIVE.value] if SpecialKeys.RECURSIVE.value in node else recursive
+        partial__ = node[SpecialKeys.PARTIAL.value] if SpecialKeys.PARTIAL.value in node else partial
 
     # TODO: some function to use for logging (i.e. the full path to this node if we run into an error at this step)
     # full_key = node._get_full_key()
@@ -74,27 +301,43 @@ def _instantiate_node(
 
     # if dealing with a list of configs then instantiate recursively instantiate each config in the list
     if rb_base.is_list_config(node):
-        return [_instantiate_node(item, recursive=recursive__) for item in node]
+        instantiate_item = functools.partial(_instantiate_node, recursive=recursive__, lazy=lazy, read_ahead=read_ahead)
+        if lazy:
+            return LazySequence(list(node), instantiate_item, read_ahead=read_ahead)
+        return [instantiate_item(item) for item in node]
 
     # if dealing with a regular config, optionally recursively instantiate on each key
     elif rb_base.is_dict_config(node):
         if rb_base.is_target_node(node):
-            kwargs = {}
-            for key in node.keys():
-                if key not in exclude_keys:
-                    value = node[key]
-                    if recursive__:
-                        value = _instantiate_node(value, recursive=recursive__)
-                    kwargs[key] = value
 
-            target__ = _resolve_target(node[SpecialKeys.TARGET], full_key=full_key)
-            return _call_target(target__, partial__, *args, full_key=full_key, **kwargs)
+            def _instantiate_target_node() -> Any:
+                kwargs = {}
+                for key in node.keys:
+                    if key not in exclude_keys:
+                        value = node[key]
+                        if recursive__:
+                            value = _instantiate_node(value, recursive=recursive__, lazy=lazy, read_ahead=read_ahead)
+                        kwargs[key] = value
+
+                target__ = _resolve_target(node[SpecialKeys.TARGET.value], full_key=full_key)
+                return _call_target(target__, partial__, *args, full_key=full_key, **kwargs)
+
+            # objects are only shared when they're fully determined by their config (i.e. no positional args)
+            scope__ = InstanceScope(getattr(node, SpecialKeys.SCOPE.value, InstanceScope.PER_CALL))
+            structural_hash = _structural_hash(node) if scope__ != InstanceScope.PER_CALL and not args else None
+            if structural_hash is None:
+                return _instantiate_target_node()
+            # NB: objects instantiated lazily (i.e. with `LazySequence`s for list configs) aren't shared with eager ones
+            cache_key = (*structural_hash, lazy, read_ahead if lazy else 0)
+            return _instance_cache.get_or_create(scope__, cache_key, _instantiate_target_node)
 
         else:
             instantiated_node = node.copy()
-            for key in node.keys():
+            for key in node.keys:
                 if key not in exclude_keys and recursive__:
-                    instantiated_node[key] = _instantiate_node(node[key], recursive=recursive__)
+                    value = _instantiate_node(node[key], recursive=recursive__, lazy=lazy, read_ahead=read_ahead)
+                    # NB: bypasses validation as instantiated values are (generally) no longer configs
+                    object.__setattr__(instantiated_node, key, value)
             return instantiated_node
 
     # we should never get here, the exit conditions for non-config nodes are defined above
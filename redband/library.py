@@ -1,43 +1,93 @@
 import importlib
+import os
 import pkgutil
-from typing import Dict, List, Optional, Type, Union
+import sys
+import threading
+import weakref
+from pathlib import Path
+from types import MappingProxyType
+from typing import Collection, Dict, List, Mapping, Optional, Set, Type, Union
 
 from redband.base import BaseConfig, REDBAND_CONFIG_CLASSES
 
+ConfigTypeOrSubclass = Type[BaseConfig]
+ConfigGroup = Dict[str, Union[Type[BaseConfig], "ConfigGroup"]]
+ConfigTypeOrList = Union[ConfigTypeOrSubclass, List[ConfigTypeOrSubclass]]
 
-class Singleton(type):
-    def __init__(cls, name, bases, dict) -> "Singleton":
-        super(Singleton, cls).__init__(name, bases, dict)
-        cls.instance = None
 
-    def __call__(cls, *args, **kwargs):
-        if cls.instance is None:
-            cls.instance = super(Singleton, cls).__call__(*args, **kwargs)
-        return cls.instance
+class ConfigLibraryException(Exception):
+    ...
 
 
-ConfigTypeOrSubclass = Type[BaseConfig]
-ConfigGroup = Dict[str, Union[Type[BaseConfig], "ConfigGroup"]]
-ConfigTypeOrList = Union[ConfigTypeOrSubclass, List[ConfigTypeOrSubclass]]
+def _freeze_config_group(config_group: Mapping) -> Mapping:
+    return MappingProxyType(
+        {k: _freeze_config_group(v) if isinstance(v, Mapping) else v for k, v in config_group.items()}
+    )
+
+
+def _thaw_config_group(config_group: Mapping) -> ConfigGroup:
+    return {k: _thaw_config_group(v) if isinstance(v, Mapping) else v for k, v in config_group.items()}
 
 
-class ConfigLibrary(object, metaclass=Singleton):
-    """A Singleton class object that represents a complete collection available to the user.
-    Configs should be registered to the ConfigLibrary once, on startup, and can then be
-    accessed from anywhere within that execution.
+class ConfigLibrary(object):
+    """A collection of configs available to the user. Configs should be registered to a ConfigLibrary once,
+    on startup, and can then be accessed from anywhere within that execution.
+
+    Most code uses the process-wide default library (see `get_config_library`), but separate libraries can
+    be created and passed explicitly, e.g. for two entrypoints with different config directories in one
+    process. `freeze` returns an immutable snapshot that can be shared read-only between threads.
+
+    Args:
+        configs: the (nested) config groups to start from
+        frozen: whether configs can no longer be added
+        source_paths:
+            if given, the library is isolated: only configs defined in these files (or in files under these
+            directories) are added when it's filled (see `fill_config_library`), rather than every config that
+            has been imported in the process
     """
 
-    configs: Dict[str, ConfigGroup] = {}
+    def __init__(
+        self,
+        configs: Optional[Mapping[str, ConfigGroup]] = None,
+        frozen: bool = False,
+        source_paths: Optional[Collection[Union[str, Path]]] = None,
+    ):
+        self.configs: Mapping[str, ConfigGroup] = configs if configs is not None else {}
+        self.frozen = frozen
+        self.source_paths: Optional[Set[Path]] = (
+            {Path(p).resolve() for p in source_paths} if source_paths is not None else None
+        )
+        # the config lib dirs / entrypoint files whose configs have already been added to this library
+        self.filled_paths: Set[str] = set()
+        self._lock = threading.RLock()
+        _all_config_libraries.add(self)
+
+    def __getstate__(self) -> Dict:
+        # NB: mappingproxies (of frozen libraries) can't be pickled, so configs are pickled as plain dicts
+        state = self.__dict__.copy()
+        state["configs"] = _thaw_config_group(self.configs)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        if self.frozen:
+            self.configs = _freeze_config_group(self.configs)
+        self._lock = threading.RLock()
+        _all_config_libraries.add(self)
 
     def add(self, config: ConfigTypeOrList):
         """#TODO: docstring"""
+        if self.frozen:
+            raise ConfigLibraryException("Configs can't be added to a frozen ConfigLibrary")
 
-        _cur_config_group = self.configs
-        for g in config._group().split("."):
-            if g not in _cur_config_group:
-                _cur_config_group[g] = {}
-            _cur_config_group = _cur_config_group[g]
-        _cur_config_group[config._name()] = config
+        with self._lock:
+            _cur_config_group = self.configs
+            for g in config._group().split("."):
+                if g not in _cur_config_group:
+                    _cur_config_group[g] = {}
+                _cur_config_group = _cur_config_group[g]
+            _cur_config_group[config._name()] = config
 
     def get_config_group(self, group: str) -> ConfigGroup:
         """Returns a dict of the configs that have been added to the library
@@ -51,22 +101,99 @@ class ConfigLibrary(object, metaclass=Singleton):
             _cur_config_group = _cur_config_group[g]
         return _cur_config_group
 
+    def freeze(self) -> "ConfigLibrary":
+        """Returns an immutable snapshot of this library, which is safe to share between threads (& is
+        inherited as-is by forked processes).
+        """
+        with self._lock:
+            frozen_config_lib = ConfigLibrary(_freeze_config_group(self.configs), frozen=True)
+            frozen_config_lib.source_paths = self.source_paths
+            frozen_config_lib.filled_paths = set(self.filled_paths)
+        return frozen_config_lib
+
+
+# locks can't be safely inherited by a forked child (they may be held by a thread that doesn't exist in the
+# child), so every library gets a fresh lock after a fork
+_all_config_libraries: "weakref.WeakSet[ConfigLibrary]" = weakref.WeakSet()
+
+
+def _reset_locks_after_fork() -> None:
+    for config_lib in _all_config_libraries:
+        config_lib._lock = threading.RLock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_locks_after_fork)
+
+
+_default_config_lib = ConfigLibrary()
+
+
+def get_config_library() -> ConfigLibrary:
+    """Returns the process-wide default ConfigLibrary."""
+    return _default_config_lib
+
+
+def set_config_library(config_lib: ConfigLibrary) -> None:
+    """Replaces the process-wide default ConfigLibrary, e.g. with a pre-built, frozen library s.t. process
+    pool workers (forked after this call) inherit it without re-importing or re-registering any configs.
+    """
+    global _default_config_lib
+    _default_config_lib = config_lib
+
+
+def _is_defined_in(config: Type[BaseConfig], source_paths: Collection[Path]) -> bool:
+    """Whether a config class is defined in one of the given files, or in a file under one of the given dirs."""
+    module_file = getattr(sys.modules.get(config.__module__), "__file__", None)
+    if module_file is None:
+        return False
+    module_path = Path(module_file).resolve()
+    return any(module_path == p or p in module_path.parents for p in source_paths)
+
 
 def _add_config_to_library(config: Type[BaseConfig], config_lib: ConfigLibrary):
     """#TODO: docstring + add better exception handling."""
     for config_subclass in config.__subclasses__():
         _add_config_to_library(config_subclass, config_lib)
-    if config not in REDBAND_CONFIG_CLASSES:
+    # NB: the private copies of config classes made during composition are never part of the library, and
+    # neither are configs from outside the sources of an isolated library
+    if config in REDBAND_CONFIG_CLASSES or config._is_copy():
+        return
+    if config_lib.source_paths is None or _is_defined_in(config, config_lib.source_paths):
         config_lib.add(config)
 
 
-def fill_config_library(entrypoint_file_path: str, config_lib_dir: Optional[str] = None) -> None:
-    """Fills the ConfigLibrary singleton with all the configs defined in either the given config directory
-    (if one is passed via an environment variable, the command-line, or in the entrypoint arguments) or
-    from within the entrypoint file.
+def fill_config_library(
+    entrypoint_file_path: str,
+    config_lib_dir: Optional[str] = None,
+    config_lib: Optional[ConfigLibrary] = None,
+) -> ConfigLibrary:
+    """Fills a ConfigLibrary (by default the process-wide library) with all the configs that have been imported,
+    after importing those in the given config directory (if one is passed via an environment variable, the
+    command-line, or in the entrypoint arguments). Isolated libraries (see `ConfigLibrary`) only get the configs
+    defined in their own source paths, s.t. e.g. entrypoints with different config directories in one process each
+    get only their own configs. Libraries that are frozen, or that have already been filled from the same location,
+    are returned as-is.
     """
+    config_lib = config_lib if config_lib is not None else get_config_library()
     config_lib_path = config_lib_dir if config_lib_dir is not None else entrypoint_file_path
-    for _, name, _ in pkgutil.iter_modules([config_lib_path]):
-        importlib.import_module(f"{config_lib_dir.replace('/', '.')}.{name}")
-    config_lib = ConfigLibrary()
-    _add_config_to_library(BaseConfig, config_lib)
+    if config_lib.frozen or config_lib_path in config_lib.filled_paths:
+        return config_lib
+
+    with config_lib._lock:
+        if config_lib_path in config_lib.filled_paths:
+            return config_lib
+        for _, name, _ in pkgutil.iter_modules([config_lib_path]):
+            importlib.import_module(f"{config_lib_dir.replace('/', '.')}.{name}")
+        _add_config_to_library(BaseConfig, config_lib)
+        config_lib.filled_paths.add(config_lib_path)
+    return config_lib
+
+
+def build_config_library(entrypoint_file_path: str, config_lib_dir: Optional[str] = None) -> ConfigLibrary:
+    """Builds a frozen ConfigLibrary & sets it as the process-wide default. Call this before creating a
+    (fork-based) process pool s.t. workers inherit the pre-built library rather than re-building their own.
+    """
+    config_lib = fill_config_library(entrypoint_file_path, config_lib_dir, config_lib=ConfigLibrary()).freeze()
+    set_config_library(config_lib)
+    return config_lib
@@ -0,0 +1,75 @@
+from typing import Any, Type, TypeVar
+
+from redband.base import BaseConfig, is_config_node
+from redband.typing import DictStrAny
+
+# marks the (nested) config dicts of sub-configs selected from a config group (e.g. `optimizer=adam`), whose value
+# is the selected config class, s.t. the selection survives merging alongside values for the selected config
+SELECTED_CONFIG_KEY = "__selected_config__"
+
+ConfigOrConfigClass = TypeVar("ConfigOrConfigClass", BaseConfig, Type[BaseConfig])
+
+
+class MergeException(Exception):
+    ...
+
+
+def _merge_value(current_value: Any, value: Any) -> Any:
+    """Merges a value from a config dict into the current value of a parameter: selected sub-configs are built
+    from the selected class (& the values set alongside the selection), dicts are merged into the current
+    sub-config (or dict), and any other value replaces the current value.
+    """
+    if isinstance(value, dict) and SELECTED_CONFIG_KEY in value:
+        config_class = value[SELECTED_CONFIG_KEY]
+        return config_class(**_merge_values(config_class, {}, value))
+    if isinstance(value, dict) and isinstance(current_value, BaseConfig):
+        return merge(current_value, value)
+    if isinstance(value, dict) and isinstance(current_value, dict):
+        return {**current_value, **{k: _merge_value(current_value.get(k), v) for k, v in value.items()}}
+    return value
+
+
+def _merge_values(config_class: Type[BaseConfig], values: DictStrAny, config_dict: DictStrAny) -> DictStrAny:
+    merged_values = dict(values)
+    for key, value in config_dict.items():
+        if key == SELECTED_CONFIG_KEY:
+            continue
+        if key not in config_class.__fields__:
+            raise MergeException(f"Can't merge '{key}' into '{config_class.__name__}', which has no such parameter")
+        current_value = merged_values[key] if key in merged_values else config_class.__fields__[key].get_default()
+        merged_values[key] = _merge_value(current_value, value)
+    return merged_values
+
+
+def _merge_config_class(config_class: Type[BaseConfig], config_dict: DictStrAny) -> Type[BaseConfig]:
+    for key, value in config_dict.items():
+        # keys that aren't parameters of the config class were added with a '+' override
+        if key not in config_class.__fields__:
+            config_class._add_fields(**{key: _merge_value(None, value)})
+            continue
+        config_class._set_param(key, _merge_value(config_class.__fields__[key].get_default(), value))
+    return config_class
+
+
+def merge(config: ConfigOrConfigClass, config_dict: DictStrAny) -> ConfigOrConfigClass:
+    """Merges a (nested) config dict into a config class or instance. Config classes are merged into inplace,
+    by setting the default of each parameter in the config dict (s.t. instantiating the class validates the
+    merged config), whereas config instances are never mutated: a new, validated instance is returned.
+
+    Sub-configs are never merged into inplace either, so composing on a private copy of an entrypoint config class
+    (see `BaseConfig._copy`) leaves every other config class untouched.
+
+    Args:
+        config: the config class or instance to merge into
+        config_dict:
+            the config dict, e.g. composed from an entrypoint YAML or command-line overrides. Nested dicts are merged
+            into sub-configs, and `SELECTED_CONFIG_KEY` marks the sub-configs selected from a config group.
+    """
+    config_dict = config_dict or {}
+    if is_config_node(config):
+        return _merge_config_class(config, config_dict)
+    if isinstance(config, BaseConfig):
+        config_class = type(config)
+        values = {key: getattr(config, key) for key in config.__fields_set__}
+        return config_class(**_merge_values(config_class, values, config_dict))
+    raise MergeException(f"Can only merge into config classes or instances, not '{type(config).__name__}'")
@@ -0,0 +1,361 @@
+import ast
+import copy
+import enum
+import functools
+import re
+import weakref
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Type
+
+from pydantic.error_wrappers import ValidationError
+from pydantic.fields import ModelField
+
+from redband.base import BaseConfig, is_config_node
+from redband.library import ConfigLibrary, get_config_library
+from redband.typing import DictStrAny
+
+
+class OverrideException(Exception):
+    ...
+
+
+@enum.unique
+class OverrideType(enum.Enum):
+    """The operation performed by a command-line override, identified by the override's prefix."""
+
+    # key=value: set an existing config parameter (or select a config from a group)
+    SET = ""
+
+    # +key=value: add a parameter that isn't part of the config schema
+    ADD = "+"
+
+    # ~key: delete a parameter set by the entrypoint YAML s.t. the config class default is used
+    DELETE = "~"
+
+
+class Override(NamedTuple):
+    override_type: OverrideType
+    key: str
+    value: Any
+    input_str: str
+
+
+# <prefix><dotted.key>[=<value>]
+_OVERRIDE_REGEX = re.compile(
+    r"^(?P<prefix>[+~]?)(?P<key>[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)(?:=(?P<value>.*))?$",
+    re.DOTALL,
+)
+
+# tokens of container values, e.g. [1, 'a b', {x: null}]
+_TOKEN_REGEX = re.compile(
+    r"""\s*(?:
+        (?P<punct>[\[\]{},:])
+        |(?P<quoted>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+        |(?P<bare>[^\s\[\]{},:'"]+(?:[^\S\n]+[^\s\[\]{},:'"]+)*)
+    )\s*""",
+    re.VERBOSE,
+)
+
+_NULL_STRS = {"null", "None"}
+
+
+def _parse_primitive(value_str: str) -> Optional[str]:
+    """Unquoted primitives are kept as strings (to be coerced to the type of the field they override),
+    with the exception of `null` which always means None.
+    """
+    return None if value_str in _NULL_STRS else value_str
+
+
+def _tokenize(value_str: str, override_str: str) -> List[Tuple[str, str]]:
+    tokens, pos = [], 0
+    while pos < len(value_str):
+        match = _TOKEN_REGEX.match(value_str, pos)
+        if match is None or match.end() == pos:
+            raise OverrideException(
+                f"Could not parse override '{override_str}': unexpected character at '{value_str[pos:]}'"
+            )
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        pos = match.end()
+    return tokens
+
+
+def _parse_container(tokens: List[Tuple[str, str]], override_str: str) -> Any:
+    """A recursive-descent parser for (possibly nested) list & dict values."""
+
+    def _error(message: str) -> OverrideException:
+        return OverrideException(f"Could not parse override '{override_str}': {message}")
+
+    def _parse_value(i: int) -> Tuple[Any, int]:
+        if i >= len(tokens):
+            raise _error("unexpected end of value")
+        kind, token = tokens[i]
+        if kind == "quoted":
+            return ast.literal_eval(token), i + 1
+        if kind == "bare":
+            return _parse_primitive(token), i + 1
+        if token == "[":
+            return _parse_sequence(i + 1, "]", is_dict=False)
+        if token == "{":
+            return _parse_sequence(i + 1, "}", is_dict=True)
+        raise _error(f"unexpected '{token}'")
+
+    def _parse_sequence(i: int, close: str, is_dict: bool) -> Tuple[Any, int]:
+        items: Any = {} if is_dict else []
+        if i < len(tokens) and tokens[i][1] == close:
+            return items, i + 1
+        while True:
+            if is_dict:
+                key, i = _parse_value(i)
+                if not isinstance(key, str) or i >= len(tokens) or tokens[i][1] != ":":
+                    raise _error("dict items must be of the form '<key>: <value>'")
+                items[key], i = _parse_value(i + 1)
+            else:
+                item, i = _parse_value(i)
+                items.append(item)
+            if i >= len(tokens):
+                raise _error(f"missing closing '{close}'")
+            if tokens[i][1] == close:
+                return items, i + 1
+            if tokens[i][1] != ",":
+                raise _error(f"expected ',' or '{close}' but found '{tokens[i][1]}'")
+            i += 1
+
+    value, i = _parse_value(0)
+    if i != len(tokens):
+        raise _error(f"unexpected trailing '{tokens[i][1]}'")
+    return value
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_override(override_str: str) -> Override:
+    match = _OVERRIDE_REGEX.match(override_str)
+    if match is None:
+        raise OverrideException(
+            f"Could not parse override '{override_str}': overrides must be of the form "
+            "'<key>=<value>', '+<key>=<value>', or '~<key>'"
+        )
+    override_type = OverrideType(match.group("prefix"))
+    key, value_str = match.group("key"), match.group("value")
+
+    if override_type == OverrideType.DELETE:
+        if value_str is not None:
+            raise OverrideException(f"Could not parse override '{override_str}': deletions can't take a value")
+        return Override(override_type, key, None, override_str)
+    if value_str is None:
+        raise OverrideException(f"Could not parse override '{override_str}': missing '=<value>'")
+
+    stripped_value_str = value_str.strip()
+    if stripped_value_str[:1] in {"[", "{", "'", '"'}:
+        value = _parse_container(_tokenize(stripped_value_str, override_str), override_str)
+    else:
+        value = _parse_primitive(value_str)
+    return Override(override_type, key, value, override_str)
+
+
+def parse_override(override_str: str) -> Override:
+    """Parses a single command-line override. The override grammar is:
+        key=value         sets a parameter (or selects a config from a group)
+        +key=value        adds a parameter that isn't part of the config schema
+        ~key              deletes a parameter set in the entrypoint YAML
+    where `value` can be a primitive, `null`, a single- or double-quoted string, or a (nested) list
+    `[a, b]` or dict `{a: 1, b: [2]}`. Unquoted primitives are left as strings to be coerced to the
+    type of the field they override.
+    """
+    override = _parse_override(override_str)
+    # parsed overrides are cached, so make sure callers can't mutate the cached containers
+    if isinstance(override.value, (list, dict)):
+        override = override._replace(value=copy.deepcopy(override.value))
+    return override
+
+
+def parse_overrides(override_strs: List[str]) -> List[Override]:
+    return [parse_override(override_str) for override_str in override_strs]
+
+
+FieldCoercer = Callable[[Any, str], Any]
+
+# field coercers are derived once per config class (& dropped along with the class)
+_coercers_cache: "weakref.WeakKeyDictionary[Type[BaseConfig], Dict[str, Tuple[ModelField, FieldCoercer]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _make_coercer(config_class: Type[BaseConfig], field: ModelField) -> FieldCoercer:
+    def _coerce(value: Any, override_str: str) -> Any:
+        coerced_value, error = field.validate(value, {}, loc=field.name, cls=config_class)
+        if error:
+            raise OverrideException(
+                f"Invalid override '{override_str}': {ValidationError([error], config_class)}"
+            ) from None
+        return coerced_value
+
+    return _coerce
+
+
+def _get_field_coercers(config_class: Type[BaseConfig]) -> Dict[str, Tuple[ModelField, FieldCoercer]]:
+    """Returns the (field, coercer) of each field of a config class, creating them on first use."""
+    coercers = _coercers_cache.get(config_class)
+    if coercers is None:
+        coercers = {
+            name: (field, _make_coercer(config_class, field)) for name, field in config_class.__fields__.items()
+        }
+        _coercers_cache[config_class] = coercers
+    return coercers
+
+
+def _get_config_field_class(field: ModelField) -> Optional[Type[BaseConfig]]:
+    """Returns the config class of a sub-config field (the class of its default if that's a config class or
+    config instance), else None.
+    """
+    default = field.get_default()
+    if is_config_node(default):
+        return default
+    if isinstance(default, BaseConfig):
+        return type(default)
+    return field.type_ if is_config_node(field.type_) else None
+
+
+def _flatten_config_dict(config_dict: DictStrAny, prefix: str = "") -> DictStrAny:
+    flat_config_dict = {}
+    for key, value in config_dict.items():
+        if isinstance(value, dict):
+            flat_config_dict.update(_flatten_config_dict(value, prefix=f"{prefix}{key}."))
+        else:
+            flat_config_dict[f"{prefix}{key}"] = value
+    return flat_config_dict
+
+
+def get_group_selections(
+    entrypoint_config_class: Type[BaseConfig],
+    config_dict: DictStrAny,
+    config_lib: Optional[ConfigLibrary] = None,
+) -> Dict[str, Type[BaseConfig]]:
+    """Returns the configs selected by name for sub-config fields in a (YAML) config dict, keyed by their dotted
+    key (e.g. `{"optimizer": SgdConfig}` for `optimizer: sgd`). Invalid keys are ignored, they're reported when
+    the config dict is merged.
+    """
+    config_lib = config_lib if config_lib is not None else get_config_library()
+    selected_classes: Dict[str, Type[BaseConfig]] = {}
+
+    flat_config_dict = _flatten_config_dict(config_dict or {})
+    for key in sorted(flat_config_dict, key=lambda k: k.count(".")):
+        value = flat_config_dict[key]
+        if not isinstance(value, str):
+            continue
+        config_class, field = entrypoint_config_class, None
+        *parent_keys, leaf_key = key.split(".")
+        for depth, sub_key in enumerate(parent_keys + [leaf_key]):
+            field = config_class.__fields__.get(sub_key) if config_class is not None else None
+            if field is None:
+                break
+            if depth < len(parent_keys):
+                prefix = ".".join(parent_keys[: depth + 1])
+                config_class = selected_classes.get(prefix) or _get_config_field_class(field)
+
+        field_config_class = _get_config_field_class(field) if field is not None else None
+        if field_config_class is not None:
+            try:
+                selected_classes[key] = config_lib.get_config_group(field_config_class._group())[value]
+            except KeyError:
+                pass
+    return selected_classes
+
+
+def coerce_overrides(
+    entrypoint_config_class: Type[BaseConfig],
+    overrides: List[Override],
+    config_lib: Optional[ConfigLibrary] = None,
+    selected_classes: Optional[Dict[str, Type[BaseConfig]]] = None,
+) -> DictStrAny:
+    """Validates & converts parsed overrides in a single pass against the config schema, before they're
+    merged into any config. Values are coerced to the type of the field they override, group selections
+    are checked against the `ConfigLibrary`, and any error points at the offending override.
+
+    Args:
+        entrypoint_config_class: the (user's) entrypoint config class
+        overrides: the parsed overrides, see `parse_overrides`
+        config_lib: the library in which to find config groups (defaults to the process-wide library)
+        selected_classes:
+            configs already selected for sub-config fields, by dotted key (e.g. by the entrypoint YAML, see
+            `get_group_selections`), against which overrides of their nested keys are checked
+
+    Returns a dict of dotted keys —> coerced values (deletions are not included, see `apply_deletions`)
+    """
+    config_lib = config_lib if config_lib is not None else get_config_library()
+    config_dict = {}
+
+    # group selections are resolved first s.t. later overrides of nested keys are checked against the
+    # selected config (e.g. `optimizer=sgd optimizer.momentum=0.9`)
+    selected_classes = dict(selected_classes or {})
+    sorted_overrides = sorted(overrides, key=lambda o: o.key.count("."))
+
+    for override in sorted_overrides:
+        if override.override_type == OverrideType.DELETE:
+            continue
+
+        config_class, field = entrypoint_config_class, None
+        *parent_keys, leaf_key = override.key.split(".")
+        for depth, key in enumerate(parent_keys + [leaf_key]):
+            coercers = _get_field_coercers(config_class)
+            if key not in coercers:
+                if override.override_type == OverrideType.ADD and depth == len(parent_keys):
+                    field = None
+                    break
+                raise OverrideException(
+                    f"Invalid override '{override.input_str}': '{config_class.__name__}' has no parameter '{key}'"
+                    + (" (use '+' to add a new parameter)" if depth == len(parent_keys) else "")
+                )
+            field, coerce = coercers[key]
+            if depth < len(parent_keys):
+                prefix = ".".join(parent_keys[: depth + 1])
+                config_class = selected_classes.get(prefix) or _get_config_field_class(field)
+                if config_class is None:
+                    raise OverrideException(
+                        f"Invalid override '{override.input_str}': '{prefix}' is not a config so has no parameters"
+                    )
+
+        if override.override_type == OverrideType.ADD:
+            if field is not None:
+                raise OverrideException(
+                    f"Invalid override '{override.input_str}': '{override.key}' already exists (drop the '+')"
+                )
+            config_dict[override.key] = override.value
+            continue
+
+        field_config_class = _get_config_field_class(field)
+        if field_config_class is not None and isinstance(override.value, str):
+            try:
+                config_group = config_lib.get_config_group(field_config_class._group())
+                selected_classes[override.key] = config_group[override.value]
+                # a new selection replaces any (e.g. YAML) selections within the previously selected config
+                for key in [k for k in selected_classes if k.startswith(f"{override.key}.")]:
+                    del selected_classes[key]
+            except KeyError:
+                raise OverrideException(
+                    f"Invalid override '{override.input_str}': '{override.value}' is not a config in the "
+                    f"'{field_config_class._group()}' group"
+                ) from None
+            config_dict[override.key] = override.value
+        elif field_config_class is not None:
+            config_dict[override.key] = override.value
+        else:
+            config_dict[override.key] = coerce(override.value, override.input_str)
+
+    return config_dict
+
+
+def apply_deletions(config_dict: DictStrAny, overrides: List[Override]) -> DictStrAny:
+    """Removes the keys deleted by `~key` overrides from a (nested) config dict, inplace."""
+    for override in overrides:
+        if override.override_type != OverrideType.DELETE:
+            continue
+        *parent_keys, leaf_key = override.key.split(".")
+        _cur_dict = config_dict
+        for key in parent_keys:
+            _cur_dict = _cur_dict.get(key) if isinstance(_cur_dict, dict) else None
+        if not isinstance(_cur_dict, dict) or leaf_key not in _cur_dict:
+            raise OverrideException(
+                f"Invalid override '{override.input_str}': there is no '{override.key}' in the entrypoint YAML to delete"
+            )
+        del _cur_dict[leaf_key]
+    return config_dict
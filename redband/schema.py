@@ -0,0 +1,197 @@
+import hashlib
+import inspect
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Set, Type
+
+from pydantic.typing import display_as_type
+
+from redband.base import BaseConfig, is_config_node
+from redband.library import ConfigLibrary
+from redband.overrides import _get_config_field_class, OverrideType
+from redband.serialization import _iter_config_classes
+from redband.typing import DictStrAny
+
+# the directory in which schema indices are cached (defaults to ~/.cache/redband)
+CACHE_DIR_ENV_VAR = "RB_CACHE_DIR"
+
+
+def _cache_dir() -> Path:
+    return Path(os.getenv(CACHE_DIR_ENV_VAR) or Path.home() / ".cache" / "redband")
+
+
+def _display_default(default: Any) -> str:
+    if is_config_node(default):
+        return default._name()
+    if isinstance(default, BaseConfig):
+        return default.name__ or type(default).__name__
+    return repr(default)
+
+
+def _schema_index_key(entrypoint_config_class: Type[BaseConfig], config_lib_dir: Optional[str]) -> str:
+    """Derives the cache key of a schema index from the modification times of every file that (currently) defines
+    a config class, and of the config library directory, without importing anything.
+    """
+    from redband import __version__
+
+    source_files: Set[str] = set()
+    for config_class in _iter_config_classes():
+        try:
+            source_files.add(inspect.getfile(config_class))
+        except TypeError:
+            # e.g. config classes created dynamically
+            pass
+    if config_lib_dir is not None:
+        source_files.update(str(f) for f in Path(config_lib_dir).rglob("*.py"))
+
+    key_parts = [__version__, entrypoint_config_class.__module__, entrypoint_config_class.__qualname__]
+    for source_file in sorted(source_files):
+        if os.path.exists(source_file):
+            key_parts.append(f"{os.path.abspath(source_file)}:{os.stat(source_file).st_mtime_ns}")
+    return hashlib.sha1("\n".join(key_parts).encode("utf-8")).hexdigest()
+
+
+def build_schema_index(entrypoint_config_class: Type[BaseConfig], config_lib: ConfigLibrary) -> DictStrAny:
+    """Builds an index of every overridable key of an entrypoint config (its type, default, and, for sub-configs,
+    the configs in its group that can be selected), along with all the groups of the ConfigLibrary.
+    """
+    keys = {}
+
+    def _index_config_class(config_class: Type[BaseConfig], prefix: str, seen: Set[type]) -> None:
+        for name, field in config_class.__fields__.items():
+            # special keys aren't overridable
+            if name.endswith("__"):
+                continue
+            key = f"{prefix}{name}"
+            keys[key] = {
+                "type": display_as_type(field.outer_type_),
+                "default": _display_default(field.get_default()) if not field.required else None,
+                "required": bool(field.required),
+                "group": None,
+                "choices": [],
+            }
+            sub_config_class = _get_config_field_class(field)
+            if sub_config_class is not None and sub_config_class not in seen:
+                group = sub_config_class._group()
+                keys[key]["group"] = group
+                try:
+                    keys[key]["choices"] = sorted(
+                        k for k, v in config_lib.get_config_group(group).items() if is_config_node(v)
+                    )
+                except KeyError:
+                    pass
+                _index_config_class(sub_config_class, f"{key}.", seen | {sub_config_class})
+
+    def _index_groups(config_group: DictStrAny, prefix: str) -> DictStrAny:
+        groups = {}
+        choices = sorted(k for k, v in config_group.items() if is_config_node(v))
+        if prefix and choices:
+            groups[prefix] = choices
+        for k, v in config_group.items():
+            if not is_config_node(v):
+                groups.update(_index_groups(v, f"{prefix}.{k}" if prefix else k))
+        return groups
+
+    _index_config_class(entrypoint_config_class, "", {entrypoint_config_class})
+    return {"keys": keys, "groups": _index_groups(config_lib.configs, "")}
+
+
+def get_schema_index(
+    entrypoint_config_class: Type[BaseConfig],
+    config_lib_dir: Optional[str],
+    build_config_lib: Callable[[], ConfigLibrary],
+) -> DictStrAny:
+    """Returns the schema index of an entrypoint config from the on-disk cache, only building the ConfigLibrary
+    (with `build_config_lib`) & the index if the entrypoint or config library source files have changed.
+    """
+    cache_file = _cache_dir() / f"schema-{_schema_index_key(entrypoint_config_class, config_lib_dir)}.json"
+    if cache_file.exists():
+        try:
+            with open(cache_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # e.g. a partially written cache file, which is rebuilt below
+            pass
+
+    schema_index = build_schema_index(entrypoint_config_class, build_config_lib())
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_cache_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_cache_file, "w") as f:
+            json.dump(schema_index, f)
+        os.replace(tmp_cache_file, cache_file)
+    except OSError:
+        # caching is best-effort (e.g. on a read-only file system)
+        pass
+    return schema_index
+
+
+def format_help(schema_index: DictStrAny, prog: str) -> str:
+    """Formats the application help of an entrypoint from its schema index."""
+    lines = [
+        f"usage: {prog} [key=value ...] [+key=value ...] [~key ...] [--redband-help]",
+        "",
+        "Overridable config keys:",
+    ]
+    key_width = max([len(k) for k in schema_index["keys"]] + [10]) + 2
+    type_width = max([len(v["type"]) for v in schema_index["keys"].values()] + [10]) + 2
+    for key, key_schema in schema_index["keys"].items():
+        default = "(required)" if key_schema["required"] else f"(default: {key_schema['default']})"
+        line = f"  {key:<{key_width}}{key_schema['type']:<{type_width}}{default}"
+        if key_schema["choices"]:
+            line += f"  choices: {', '.join(key_schema['choices'])}"
+        lines.append(line)
+
+    if schema_index["groups"]:
+        lines.extend(["", "Config groups:"])
+        lines.extend(f"  {group}: {', '.join(choices)}" for group, choices in schema_index["groups"].items())
+    return "\n".join(lines)
+
+
+def complete(schema_index: DictStrAny, word: str) -> List[str]:
+    """Returns the completions of a (partial) command-line override: config keys, then group choices or
+    boolean values once a key has been completed.
+    """
+    prefix = word[:1] if word[:1] in {OverrideType.ADD.value, OverrideType.DELETE.value} else ""
+    word = word[len(prefix) :]
+
+    if "=" in word:
+        key, _, partial_value = word.partition("=")
+        key_schema = schema_index["keys"].get(key)
+        if key_schema is None:
+            return []
+        values = key_schema["choices"] or (["true", "false"] if key_schema["type"] == "bool" else [])
+        return [f"{prefix}{key}={v}" for v in values if v.startswith(partial_value)]
+
+    # deletions don't take a value
+    suffix = "" if prefix == OverrideType.DELETE.value else "="
+    return [f"{prefix}{key}{suffix}" for key in schema_index["keys"] if key.startswith(word)]
+
+
+_BASH_COMPLETION_TEMPLATE = """\
+_redband_complete_{func_name}() {{
+    local line="${{COMP_LINE:0:$COMP_POINT}}"
+    local cur="${{line##* }}"
+    local IFS=$'\\n'
+    local candidates=($({command} --complete "$cur" 2>/dev/null))
+    # bash splits words on '=' & ':', so only the part of each candidate after the last of those is completed
+    local trim="${{cur%"${{cur##*[=:]}}"}}"
+    COMPREPLY=("${{candidates[@]#"$trim"}}")
+}}
+complete -o nospace -F _redband_complete_{func_name} {names}
+"""
+
+
+def bash_completion_script(python_executable: str, entrypoint_file_path: str) -> str:
+    """Returns a bash script that registers tab-completion of overrides for an entrypoint script. Usage:
+    `source <(python my_entrypoint.py --shell-completion bash)`
+    """
+    script_path = os.path.abspath(entrypoint_file_path)
+    script_name = os.path.basename(script_path)
+    func_name = "".join(c if c.isalnum() else "_" for c in script_name)
+    return _BASH_COMPLETION_TEMPLATE.format(
+        func_name=func_name,
+        command=f'"{python_executable}" "{script_path}"',
+        names=f"{script_name} ./{script_name} {script_path}",
+    )
@@ -0,0 +1,143 @@
+import importlib
+import json
+from typing import Any, Iterator, Optional, Type
+
+from pydantic.json import pydantic_encoder
+
+from redband.base import BaseConfig, is_config_node
+from redband.typing import DictStrAny
+
+# keys marking (sub-)config instances & classes in a config payload
+CONFIG_KEY = "__config__"
+CONFIG_CLASS_KEY = "__config_class__"
+VALUES_KEY = "values"
+# entrypoint scripts imported by `redband.server` are given private module names with this prefix, but their config
+# classes are recorded as defined in `__main__`, where the script runs when the config is received
+ENTRYPOINT_MODULE_PREFIX = "_redband_entrypoint_"
+
+
+class SerializationException(Exception):
+    ...
+
+
+def _module_name(config_class: Type[BaseConfig]) -> str:
+    module_name = config_class.__module__
+    return "__main__" if module_name.startswith(ENTRYPOINT_MODULE_PREFIX) else module_name
+
+
+def _class_path(config_class: Type[BaseConfig]) -> str:
+    return f"{_module_name(config_class)}:{config_class.__qualname__}"
+
+
+def _iter_config_classes(config_class: Type[BaseConfig] = BaseConfig) -> Iterator[Type[BaseConfig]]:
+    for subclass in config_class.__subclasses__():
+        if not subclass._is_copy():
+            yield subclass
+        yield from _iter_config_classes(subclass)
+
+
+def _resolve_config_class(class_path: str) -> Type[BaseConfig]:
+    """Resolves a 'module:QualName' class path to a config class, preferring classes that have already been
+    defined (s.t. deserializing doesn't import anything unnecessarily), then importing the module, and
+    finally matching on the class name alone (e.g. for configs defined in a `__main__` script).
+    """
+    module_name, qualname = class_path.split(":")
+    config_classes = list(_iter_config_classes())
+    # NB: newest first, as reloaded modules (e.g. by a compose server) redefine classes with the same path
+    for config_class in reversed(config_classes):
+        if _module_name(config_class) == module_name and config_class.__qualname__ == qualname:
+            return config_class
+
+    try:
+        target = importlib.import_module(module_name)
+        for attr in qualname.split("."):
+            target = getattr(target, attr)
+        return target
+    except (ImportError, AttributeError):
+        pass
+
+    for config_class in reversed(config_classes):
+        if config_class.__qualname__ == qualname:
+            return config_class
+    raise SerializationException(f"Could not find the config class '{class_path}'")
+
+
+def _to_payload_value(value: Any) -> Any:
+    if isinstance(value, BaseConfig):
+        return config_to_payload(value)
+    if is_config_node(value):
+        return {CONFIG_CLASS_KEY: _class_path(value)}
+    if isinstance(value, dict):
+        return {k: _to_payload_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_payload_value(v) for v in value]
+    return value
+
+
+def config_to_payload(config: BaseConfig) -> DictStrAny:
+    """Converts a config instance into a JSON-able payload that records the class of the config & of every
+    sub-config, s.t. group selections survive a round-trip (see `config_from_payload`).
+    """
+    config_class = type(config)
+    if config_class._is_copy():
+        config_class = config_class.__redband_copy_of__
+    values = {key: _to_payload_value(getattr(config, key)) for key in config.__fields__}
+    return {CONFIG_KEY: _class_path(config_class), VALUES_KEY: values}
+
+
+def _from_payload_value(value: Any, validate: bool) -> Any:
+    if isinstance(value, dict) and CONFIG_KEY in value:
+        return config_from_payload(value, validate=validate)
+    if isinstance(value, dict) and CONFIG_CLASS_KEY in value:
+        return _resolve_config_class(value[CONFIG_CLASS_KEY])
+    if isinstance(value, dict):
+        return {k: _from_payload_value(v, validate) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_from_payload_value(v, validate) for v in value]
+    return value
+
+
+def config_from_payload(
+    payload: DictStrAny,
+    config_class: Optional[Type[BaseConfig]] = None,
+    validate: bool = True,
+) -> BaseConfig:
+    """Converts a payload created by `config_to_payload` back into a config instance.
+
+    Args:
+        payload: the config payload
+        config_class: the class of the top-level config (by default, resolved from the payload)
+        validate:
+            whether to validate the config values. Payloads of configs that have already been validated
+            (e.g. composed by another process) can skip validation entirely.
+    """
+    config_class = config_class or _resolve_config_class(payload[CONFIG_KEY])
+    values = {key: _from_payload_value(value, validate) for key, value in payload[VALUES_KEY].items()}
+    return config_class(**values) if validate else config_class.construct(**values)
+
+
+def dumps_config(config: BaseConfig) -> str:
+    """Serializes a config instance (see `config_to_payload`) as compact JSON."""
+    return json.dumps(config_to_payload(config), default=pydantic_encoder, separators=(",", ":"))
+
+
+def loads_config(
+    config_json: str,
+    config_class: Optional[Type[BaseConfig]] = None,
+    validate: bool = True,
+) -> BaseConfig:
+    """Inverse of `dumps_config`, see `config_from_payload` for argument details."""
+    return config_from_payload(json.loads(config_json), config_class=config_class, validate=validate)
+
+
+def payload_to_dict(payload: Any) -> Any:
+    """Converts a config payload into the plain dict a config's `.dict()` would produce."""
+    if isinstance(payload, dict) and CONFIG_KEY in payload:
+        return payload_to_dict(payload[VALUES_KEY])
+    if isinstance(payload, dict) and CONFIG_CLASS_KEY in payload:
+        return payload[CONFIG_CLASS_KEY]
+    if isinstance(payload, dict):
+        return {k: payload_to_dict(v) for k, v in payload.items()}
+    if isinstance(payload, list):
+        return [payload_to_dict(v) for v in payload]
+    return payload
@@ -0,0 +1,331 @@
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic.json import pydantic_encoder
+
+from redband.base import BaseConfig
+from redband.cli import get_args_parser
+from redband.library import ConfigLibrary
+from redband.serialization import config_to_payload, ENTRYPOINT_MODULE_PREFIX
+from redband.typing import DictStrAny
+
+# the environment variable which, if set to the socket path of a running compose server, makes every
+# @redband.entrypoint compose its config via that server
+COMPOSE_SERVER_ENV_VAR = "RB_COMPOSE_SERVER"
+
+
+class ComposeServerException(Exception):
+    ...
+
+
+def default_socket_path() -> str:
+    return os.path.join(tempfile.gettempdir(), f"redband-{os.getuid()}.sock")
+
+
+def _load_entrypoint(entrypoint_file_path: str, entrypoint_name: Optional[str] = None) -> Callable[..., Any]:
+    """Imports an entrypoint script (under a private module name, s.t. its `__main__` block isn't run) and
+    returns the function decorated with @redband.entrypoint, which is found by name if one is given.
+    """
+    module_name = f"{ENTRYPOINT_MODULE_PREFIX}{hashlib.sha1(entrypoint_file_path.encode('utf-8')).hexdigest()[:12]}"
+    spec = importlib.util.spec_from_file_location(module_name, entrypoint_file_path)
+    if spec is None:
+        raise ComposeServerException(f"Could not import the entrypoint file '{entrypoint_file_path}'")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+
+    entrypoints = {name: value for name, value in vars(module).items() if hasattr(value, "__redband_entrypoint__")}
+    if entrypoint_name is None and len(entrypoints) == 1:
+        return list(entrypoints.values())[0]
+    if entrypoint_name not in entrypoints:
+        raise ComposeServerException(
+            f"Could not find an @redband.entrypoint named '{entrypoint_name}' in '{entrypoint_file_path}' "
+            f"(found {sorted(entrypoints)})"
+        )
+    return entrypoints[entrypoint_name]
+
+
+def get_config_lib_dir(argv: List[str], default: Optional[str] = None) -> Optional[str]:
+    """Returns the config lib dir an entrypoint is composed with: `--config-lib-dir` if it's in argv, else the
+    default (e.g. the client's 'RB_CONFIG_LIB_DIR').
+    """
+    cli_parser = get_args_parser()
+    cli_parser.set_defaults(config_lib_dir=default)
+    return cli_parser.parse_args(argv).config_lib_dir
+
+
+def _evict_foreign_modules(config_lib_dir: str) -> bool:
+    """Removes the top-level package of a config lib dir (& all its submodules) from `sys.modules` if any of it
+    was imported from somewhere else, i.e. it's another project's package of the same name (e.g. 'configs'),
+    s.t. the package is imported afresh from this config lib dir. Returns whether any modules were removed.
+    """
+    # NB: config lib dirs are imported as packages relative to the working directory (see `fill_config_library`)
+    if Path(config_lib_dir).is_absolute():
+        return False
+    package_name = Path(config_lib_dir).parts[0]
+    package_dir = Path(package_name).resolve()
+    package_module_names = [name for name in sys.modules if name.split(".")[0] == package_name]
+    for name in package_module_names:
+        module_file = getattr(sys.modules[name], "__file__", None)
+        if module_file is not None and package_dir not in Path(module_file).resolve().parents:
+            break
+    else:
+        return False
+
+    for name in package_module_names:
+        del sys.modules[name]
+    importlib.invalidate_caches()
+    return True
+
+
+def _parse_entrypoint_identity(entrypoint: str) -> Tuple[str, Optional[str]]:
+    """Parses '<path/to/script.py>[:<function name>]'."""
+    entrypoint_file_path, _, entrypoint_name = entrypoint.partition(":")
+    return str(Path(entrypoint_file_path).resolve()), entrypoint_name or None
+
+
+class _WarmEntrypoint(object):
+    """The state a compose server keeps warm for one entrypoint: the imported entrypoint script, its own
+    ConfigLibrary, and the modification times of the source files these were built from.
+    """
+
+    def __init__(self, entrypoint_file_path: str, entrypoint_name: Optional[str], config_lib_dir: Optional[str]):
+        self.entrypoint_file_path = entrypoint_file_path
+        if config_lib_dir is not None:
+            _evict_foreign_modules(config_lib_dir)
+        self.decorated_entrypoint = _load_entrypoint(entrypoint_file_path, entrypoint_name)
+        self.entrypoint_kwargs: DictStrAny = self.decorated_entrypoint.__redband_entrypoint__
+        self.config_lib_dir = config_lib_dir or self.entrypoint_kwargs["config_lib_dir"]
+        # NB: the config lib dir may only be known from the entrypoint, whose imports must then be redone
+        if config_lib_dir is None and self.config_lib_dir is not None and _evict_foreign_modules(self.config_lib_dir):
+            self.decorated_entrypoint = _load_entrypoint(entrypoint_file_path, entrypoint_name)
+        # NB: the library is isolated from the configs of other projects the server has imported, but includes those
+        # of modules beside the entrypoint script (which it may import its configs from)
+        source_paths = [Path(entrypoint_file_path).parent]
+        if self.config_lib_dir is not None:
+            source_paths.append(Path(self.config_lib_dir))
+        self.config_lib = ConfigLibrary(source_paths=source_paths)
+        self.source_mtimes = self._get_source_mtimes()
+
+    def _source_files(self) -> List[Path]:
+        source_files = [Path(self.entrypoint_file_path)]
+        if self.config_lib_dir is not None:
+            source_files.extend(sorted(Path(self.config_lib_dir).rglob("*.py")))
+        return source_files
+
+    def _get_source_mtimes(self) -> Dict[Path, int]:
+        return {f: f.stat().st_mtime_ns for f in self._source_files() if f.exists()}
+
+    def is_stale(self) -> bool:
+        """Whether any of the entrypoint or config library source files have changed since they were loaded.
+        NB: YAMLs don't need tracking as they're cached by modification time (see `util.load_yaml_cached`).
+        """
+        return self._get_source_mtimes() != self.source_mtimes
+
+    def reload_config_lib_modules(self) -> None:
+        if self.config_lib_dir is None:
+            return
+        config_lib_dir = Path(self.config_lib_dir).resolve()
+        for module in list(sys.modules.values()):
+            module_file = getattr(module, "__file__", None)
+            if module_file is not None and config_lib_dir in Path(module_file).resolve().parents:
+                importlib.reload(module)
+
+    def compose(self, argv: List[str]) -> BaseConfig:
+        # NB: imported here because redband.entrypoint imports this module for its client
+        from redband.entrypoint import _compose
+
+        cli_parser = get_args_parser()
+        if self.config_lib_dir is not None:
+            cli_parser.set_defaults(config_lib_dir=self.config_lib_dir)
+        cli_args = cli_parser.parse_args(argv)
+        return _compose(
+            cli_args,
+            entrypoint_func=self.decorated_entrypoint.__wrapped__,
+            entrypoint_yaml_name=self.entrypoint_kwargs["yaml_name"],
+            entrypoint_yaml_path=self.entrypoint_kwargs["yaml_path"],
+            config_lib_dir=self.config_lib_dir,
+            config_lib=self.config_lib,
+        )
+
+
+class _ComposeRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        request_line = self.rfile.readline()
+        # connections that close without sending a request are liveness checks
+        if not request_line:
+            return
+        try:
+            request = json.loads(request_line)
+            response = {"config": config_to_payload(self.server.compose(request))}
+        # NB: argparse exits on invalid arguments, which mustn't take the server down with it
+        except (Exception, SystemExit) as e:
+            response = {"error": f"{type(e).__name__}: {e}"}
+        self.wfile.write(json.dumps(response, default=pydantic_encoder).encode("utf-8") + b"\n")
+
+
+class ComposeServer(socketserver.UnixStreamServer):
+    """A local daemon that composes entrypoint configs on behalf of short-lived jobs, keeping the imported
+    entrypoints, their ConfigLibraries, parsed YAMLs and override coercers warm between requests. Caches are
+    invalidated automatically when an entrypoint's source or config library files change.
+
+    Requests are handled one at a time, as composing requires changing the working directory (& `sys.path`) of
+    the server to that of the client. Projects whose config lib dirs are packages of the same name (e.g.
+    'configs') are kept apart by re-importing the package whenever an entrypoint is (re)built for another project.
+    """
+
+    def __init__(self, socket_path: str):
+        if os.path.exists(socket_path):
+            if _is_server_running(socket_path):
+                raise ComposeServerException(f"A compose server is already running at '{socket_path}'")
+            os.unlink(socket_path)
+        self.socket_path = socket_path
+        self.base_sys_path = list(sys.path)
+        self.warm_entrypoints: Dict[Tuple[str, Optional[str], str, Optional[str]], _WarmEntrypoint] = {}
+        super().__init__(socket_path, _ComposeRequestHandler)
+
+    def compose(self, request: DictStrAny) -> BaseConfig:
+        os.chdir(request["cwd"])
+        # NB: the client's sys.path comes first s.t. its packages shadow those of any other client
+        sys.path[:] = request["sys_path"] + [p for p in self.base_sys_path if p not in request["sys_path"]]
+
+        config_lib_dir = get_config_lib_dir(request["argv"], default=request["config_lib_dir"])
+        resolved_config_lib_dir = str(Path(config_lib_dir).resolve()) if config_lib_dir is not None else None
+        key = (request["entrypoint_file_path"], request["entrypoint_name"], request["cwd"], resolved_config_lib_dir)
+        warm_entrypoint = self.warm_entrypoints.get(key)
+        if warm_entrypoint is not None and warm_entrypoint.is_stale():
+            warm_entrypoint.reload_config_lib_modules()
+            warm_entrypoint = None
+        if warm_entrypoint is None:
+            warm_entrypoint = _WarmEntrypoint(key[0], key[1], config_lib_dir)
+            self.warm_entrypoints[key] = warm_entrypoint
+
+        return warm_entrypoint.compose(request["argv"])
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def serve(socket_path: Optional[str] = None) -> None:
+    """Runs a compose server on the given Unix socket until interrupted."""
+    server = ComposeServer(socket_path or default_socket_path())
+    print(f"[redband] compose server listening on '{server.socket_path}'", file=sys.stderr)
+    # exit cleanly (removing the socket) when terminated
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def _is_server_running(socket_path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+            return True
+        except OSError:
+            return False
+
+
+def compose_remote(
+    entrypoint_file_path: str,
+    entrypoint_name: Optional[str],
+    argv: List[str],
+    socket_path: Optional[str] = None,
+    timeout: float = 60.0,
+) -> DictStrAny:
+    """Requests a composed config from a compose server. Raises an OSError if the server can't be reached
+    and a ComposeServerException if composition failed.
+
+    Args:
+        entrypoint_file_path: the path to the script containing the @redband.entrypoint
+        entrypoint_name: the name of the decorated entrypoint function
+        argv: the command-line arguments (overrides etc.) to compose with
+        socket_path: the Unix socket of the server
+        timeout: the number of seconds to wait for the server
+
+    Returns the config payload of the composed, validated config (see `redband.serialization`)
+    """
+    request = {
+        "entrypoint_file_path": str(Path(entrypoint_file_path).resolve()),
+        "entrypoint_name": entrypoint_name,
+        "argv": argv,
+        "cwd": os.getcwd(),
+        "sys_path": sys.path,
+        "config_lib_dir": os.getenv("RB_CONFIG_LIB_DIR"),
+    }
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path or default_socket_path())
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            response = json.loads(f.readline())
+
+    if "error" in response:
+        raise ComposeServerException(f"The compose server failed to compose the config: {response['error']}")
+    return response["config"]
+
+
+def _wait_for_server(socket_path: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not _is_server_running(socket_path):
+        if time.monotonic() > deadline:
+            raise ComposeServerException(f"The compose server at '{socket_path}' didn't start within {timeout}s")
+        time.sleep(0.05)
+
+
+def benchmark(entrypoint: str, overrides: List[str], n_launches: int = 20) -> Dict[str, float]:
+    """Measures launches/sec of `redband compose` composing cold (in a fresh process, as every job does without
+    a server) against composing via a (temporary) compose server, as well as the latency of a single composition
+    by the warm server (i.e. excluding the startup of the launching process).
+    """
+
+    def _launches_per_second(extra_args: List[str]) -> float:
+        start_time = time.perf_counter()
+        for _ in range(n_launches):
+            subprocess.run(
+                [sys.executable, "-m", "redband", "compose", *extra_args, entrypoint, *overrides],
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+        return n_launches / (time.perf_counter() - start_time)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        socket_path = os.path.join(tmp_dir, "redband-benchmark.sock")
+        server_process = subprocess.Popen([sys.executable, "-m", "redband", "serve", "--socket", socket_path])
+        try:
+            _wait_for_server(socket_path)
+            cold = _launches_per_second(["--no-server"])
+            warm = _launches_per_second(["--socket", socket_path])
+
+            entrypoint_file_path, entrypoint_name = _parse_entrypoint_identity(entrypoint)
+            start_time = time.perf_counter()
+            for _ in range(n_launches):
+                compose_remote(entrypoint_file_path, entrypoint_name, overrides, socket_path=socket_path)
+            server_compose_ms = 1000 * (time.perf_counter() - start_time) / n_launches
+        finally:
+            server_process.terminate()
+            server_process.wait()
+
+    return {
+        "cold_launches_per_s": cold,
+        "server_launches_per_s": warm,
+        "speedup": warm / cold,
+        "server_compose_ms": server_compose_ms,
+    }
@@ -0,0 +1,301 @@
+import json
+import operator
+import re
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Type
+
+from redband import util as rb_util
+from redband.base import BaseConfig
+from redband.typing import DictStrAny
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency, only required for config tables
+    np = None
+
+
+class ConfigTableException(Exception):
+    ...
+
+
+# the kinds of column stored in a ConfigTable: 'category' columns are dictionary-encoded as int32 codes
+# into a sorted array of unique strings (with -1 for null), 'json' columns hold arbitrary python objects
+BOOL, INT, FLOAT, CATEGORY, JSON_ = "bool", "int", "float", "category", "json"
+
+_SCHEMA_KEY = "__schema__"
+_CATEGORIES_SUFFIX = "__categories__"
+
+_CONDITION_REGEX = re.compile(r"^\s*(?P<key>[\w.]+)\s*(?P<op>==|!=|<=|>=|=|<|>)\s*(?P<value>.*?)\s*$")
+_OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+_NULL = object()
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Config tables require numpy, which can be installed with `pip install numpy`")
+
+
+def _flatten_config_dict(config_dict: Mapping[str, Any], prefix: str = "") -> DictStrAny:
+    """Flattens a nested config dict into a single-level dict with dotted keys."""
+    flat_dict = {}
+    for key, value in config_dict.items():
+        if isinstance(value, Mapping) and value:
+            flat_dict.update(_flatten_config_dict(value, prefix=f"{prefix}{key}."))
+        else:
+            flat_dict[f"{prefix}{key}"] = value
+    return flat_dict
+
+
+def _unflatten_config_dict(flat_dict: Mapping[str, Any]) -> DictStrAny:
+    """Inverse of `_flatten_config_dict`."""
+    config_dict: DictStrAny = {}
+    for key, value in flat_dict.items():
+        *parent_keys, leaf_key = key.split(".")
+        _cur_dict = config_dict
+        for parent_key in parent_keys:
+            _cur_dict = _cur_dict.setdefault(parent_key, {})
+        _cur_dict[leaf_key] = value
+    return config_dict
+
+
+def _config_to_dict(config: BaseConfig) -> DictStrAny:
+    """Converts a config instance to a dict, filling in the `name__` of every sub-config s.t. the
+    group selections made during composition are recorded in the table.
+    """
+    config_dict = {}
+    for key in config.__fields__:
+        value = getattr(config, key)
+        config_dict[key] = _config_to_dict(value) if isinstance(value, BaseConfig) else value
+    config_dict["name__"] = config.name__ or type(config).__name__
+    return json.loads(json.dumps(config_dict, default=str))
+
+
+def _infer_column_kind(values: List[Any]) -> str:
+    present_values = [v for v in values if v is not _NULL and v is not None]
+    if not present_values:
+        return JSON_
+    if all(isinstance(v, bool) for v in present_values):
+        return BOOL if len(present_values) == len(values) else JSON_
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in present_values):
+        # NB: ints with missing values are stored as floats s.t. they can hold NaN
+        return INT if len(present_values) == len(values) else FLOAT
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present_values):
+        return FLOAT
+    if all(isinstance(v, str) for v in present_values):
+        return CATEGORY
+    return JSON_
+
+
+def _encode_column(values: List[Any], kind: str) -> Dict[str, "np.ndarray"]:
+    """Encodes a list of python values (with `_NULL` for missing values) as arrays of the given kind."""
+    if kind == BOOL:
+        return {"values": np.array(values, dtype=bool)}
+    elif kind == INT:
+        return {"values": np.array(values, dtype=np.int64)}
+    elif kind == FLOAT:
+        return {"values": np.array([np.nan if v is _NULL or v is None else v for v in values], dtype=np.float64)}
+    elif kind == CATEGORY:
+        categories = sorted({v for v in values if isinstance(v, str)})
+        category_codes = {category: code for code, category in enumerate(categories)}
+        codes = np.array([category_codes.get(v, -1) if isinstance(v, str) else -1 for v in values], dtype=np.int32)
+        return {"values": codes, "categories": np.array(categories, dtype=str)}
+    else:
+        json_values = np.empty(len(values), dtype=object)
+        json_values[:] = [None if v is _NULL else v for v in values]
+        return {"values": json_values}
+
+
+class ConfigTable(object):
+    """A columnar representation of a batch of configs: each flattened, dotted config key is stored as a
+    single typed NumPy array, with string values (including group selections) dictionary-encoded. This
+    allows large numbers of configs to be saved, loaded, and filtered without building a pydantic object
+    per config.
+
+    ```
+        table = ConfigTable.from_yamls(glob.glob("sweep/*/config.yaml"))
+        adam_runs = table.where("optimizer=AdamConfig", "optimizer.lr<1e-3")
+        adam_runs.save("adam_runs.npz")
+    ```
+
+    Null values are NaN in float columns and -1 in the codes of category columns. Integer columns that
+    are missing values are stored as floats.
+    """
+
+    def __init__(self, columns: Dict[str, Dict[str, "np.ndarray"]], kinds: Dict[str, str]):
+        _require_numpy()
+        lengths = {len(column["values"]) for column in columns.values()}
+        assert len(lengths) <= 1, "All columns in a ConfigTable must have the same length"
+        self._columns = columns
+        self._kinds = kinds
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_dicts(cls, config_dicts: Iterable[Mapping[str, Any]]) -> "ConfigTable":
+        """Builds a table from (nested) config dicts, e.g. the result of `config.dict()` or a loaded YAML."""
+        _require_numpy()
+        flat_dicts = [_flatten_config_dict(config_dict) for config_dict in config_dicts]
+        keys = list(dict.fromkeys(key for flat_dict in flat_dicts for key in flat_dict))
+
+        columns, kinds = {}, {}
+        for key in keys:
+            values = [flat_dict.get(key, _NULL) for flat_dict in flat_dicts]
+            kinds[key] = _infer_column_kind(values)
+            columns[key] = _encode_column(values, kinds[key])
+        return cls(columns, kinds)
+
+    @classmethod
+    def from_configs(cls, configs: Iterable[BaseConfig]) -> "ConfigTable":
+        """Builds a table from config instances, recording the name of each selected sub-config."""
+        return cls.from_dicts(_config_to_dict(config) for config in configs)
+
+    @classmethod
+    def from_yamls(cls, yaml_paths: Iterable[str]) -> "ConfigTable":
+        """Builds a table from saved config YAMLs, without validating them as config objects."""
+        return cls.from_dicts(rb_util.load_yaml(yaml_path) or {} for yaml_path in yaml_paths)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._columns
+
+    def __getitem__(self, key: str) -> "np.ndarray":
+        """Returns the decoded values of a column (category columns are decoded to an array of objects)."""
+        column, kind = self._columns[key], self._kinds[key]
+        if kind == CATEGORY:
+            decoded = np.empty(len(self), dtype=object)
+            decoded[:] = [None] * len(self)
+            present = column["values"] >= 0
+            decoded[present] = column["categories"][column["values"][present]]
+            return decoded
+        return column["values"]
+
+    @property
+    def keys(self) -> List[str]:
+        return list(self._columns.keys())
+
+    def kind(self, key: str) -> str:
+        return self._kinds[key]
+
+    def _resolve_key(self, key: str) -> str:
+        """Allows group selections to be filtered by the group key alone (e.g. 'optimizer=AdamConfig')."""
+        if key not in self._columns and f"{key}.name__" in self._columns:
+            return f"{key}.name__"
+        if key not in self._columns:
+            raise ConfigTableException(f"There is no column '{key}' in this ConfigTable")
+        return key
+
+    def mask(self, condition: str) -> "np.ndarray":
+        """Evaluates a single '<key><op><value>' condition (op in =, ==, !=, <, <=, >, >=) to a boolean mask."""
+        match = _CONDITION_REGEX.match(condition)
+        if match is None:
+            raise ConfigTableException(f"Could not parse condition '{condition}', expected '<key><op><value>'")
+        key = self._resolve_key(match.group("key"))
+        op, value = _OPERATORS[match.group("op")], match.group("value")
+        column, kind = self._columns[key], self._kinds[key]
+
+        try:
+            if kind == BOOL:
+                return op(column["values"], value.lower() == "true")
+            elif kind in {INT, FLOAT}:
+                return op(column["values"], float(value))
+            elif kind == CATEGORY:
+                # compare against each unique category once, then gather the result by code
+                value = value.strip("'\"")
+                category_mask = np.append(op(column["categories"], value), False).astype(bool)
+                return category_mask[column["values"]]
+            else:
+                value = json.loads(value) if value not in {"", "None"} else None
+                return np.array([bool(op(v, value)) for v in column["values"]], dtype=bool)
+        except (ValueError, TypeError) as e:
+            raise ConfigTableException(f"Could not compare '{value}' with values of the {kind} column '{key}'") from e
+
+    def where(self, *conditions: str) -> "ConfigTable":
+        """Returns the rows for which all conditions hold, e.g. `table.where("optimizer=adam", "lr<1e-3")`."""
+        mask = np.ones(len(self), dtype=bool)
+        for condition in conditions:
+            mask &= self.mask(condition)
+        return self.filter(mask)
+
+    def filter(self, mask: "np.ndarray") -> "ConfigTable":
+        """Returns the rows selected by a boolean mask (or an array of indices)."""
+        columns = {
+            key: {name: array if name == "categories" else array[mask] for name, array in column.items()}
+            for key, column in self._columns.items()
+        }
+        return ConfigTable(columns, dict(self._kinds))
+
+    def to_dicts(self) -> List[DictStrAny]:
+        """Converts the table back into nested config dicts, omitting null values."""
+        decoded_columns = {key: self[key].tolist() for key in self._columns}
+        config_dicts = []
+        for i in range(len(self)):
+            flat_dict = {}
+            for key, values in decoded_columns.items():
+                value = values[i]
+                if value is None or (self._kinds[key] == FLOAT and value != value):
+                    continue
+                flat_dict[key] = value
+            config_dicts.append(_unflatten_config_dict(flat_dict))
+        return config_dicts
+
+    def to_configs(self, config_class: Type[BaseConfig]) -> List[BaseConfig]:
+        """Converts (& validates) each row of the table as an instance of the given config class."""
+        return [config_class(**config_dict) for config_dict in self.to_dicts()]
+
+    def save(self, file_path: str) -> None:
+        """Saves the table as a compressed `.npz`, to either a local or cloud `file_path`."""
+        arrays, schema = {}, {}
+        for i, (key, column) in enumerate(self._columns.items()):
+            kind = self._kinds[key]
+            schema[key] = [kind, i]
+            values = column["values"]
+            if kind == JSON_:
+                values = np.array([json.dumps(v) for v in values], dtype=str)
+            arrays[str(i)] = values
+            if kind == CATEGORY:
+                arrays[f"{i}{_CATEGORIES_SUFFIX}"] = column["categories"]
+        arrays[_SCHEMA_KEY] = np.array(json.dumps({"length": len(self), "columns": schema}))
+
+        with rb_util._tmp_copy_on_close(file_path, local_filename="table.npz") as tmp_file:
+            with open(tmp_file, "wb") as f:
+                np.savez_compressed(f, **arrays)
+
+    @classmethod
+    def load(cls, file_path: str) -> "ConfigTable":
+        """Loads a table saved with `ConfigTable.save` from either a local or cloud `file_path`."""
+        _require_numpy()
+        with rb_util._tmp_copy_on_open(file_path) as tmp_file:
+            with np.load(tmp_file, allow_pickle=False) as arrays:
+                schema = json.loads(str(arrays[_SCHEMA_KEY]))
+                columns, kinds = {}, {}
+                for key, (kind, i) in schema["columns"].items():
+                    values = arrays[str(i)]
+                    if kind == JSON_:
+                        json_values = np.empty(len(values), dtype=object)
+                        json_values[:] = [json.loads(v) for v in values.tolist()]
+                        values = json_values
+                    columns[key] = {"values": values}
+                    if kind == CATEGORY:
+                        columns[key]["categories"] = arrays[f"{i}{_CATEGORIES_SUFFIX}"]
+                    kinds[key] = kind
+        return cls(columns, kinds)
+
+
+def save_configs(configs: Iterable[BaseConfig], file_path: str) -> None:
+    """Saves a batch of configs in one columnar file (see `ConfigTable`)."""
+    ConfigTable.from_configs(configs).save(file_path)
+
+
+def load_configs(file_path: str, config_class: Optional[Type[BaseConfig]] = None) -> List[Any]:
+    """Loads a batch of configs saved with `save_configs`, as config dicts or, if given a class, as configs."""
+    table = ConfigTable.load(file_path)
+    return table.to_configs(config_class) if config_class is not None else table.to_dicts()
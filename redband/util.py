@@ -1,4 +1,6 @@
 import bz2
+import copy
+import functools
 import os
 import pickle
 import shutil
@@ -111,6 +113,19 @@ def load_yaml(yaml_path: str) -> JSON:
             return yaml.load(stream=f, Loader=Loader)
 
 
+@functools.lru_cache(maxsize=256)
+def _load_local_yaml(yaml_path: str, mtime_ns: int) -> JSON:
+    return load_yaml(yaml_path)
+
+
+def load_yaml_cached(yaml_path: str) -> JSON:
+    """Loads a YAML file to JSON, caching the parsed result of local files until they are modified."""
+    if _is_cloud_path(yaml_path):
+        return load_yaml(yaml_path)
+    # NB: copy s.t. callers can't mutate the cached object
+    return copy.deepcopy(_load_local_yaml(yaml_path, os.stat(yaml_path).st_mtime_ns))
+
+
 def save_yaml(yaml_obj: DictStrAny, file_path: str) -> None:
     """Saves a YAML object to file"""
     with _tmp_copy_on_close(file_path) as tmp_file:
@@ -0,0 +1,85 @@
+import importlib.util
+import math
+
+import pytest
+
+from redband import BaseConfig, EntrypointConfig
+from redband.artifact import ArtifactException, build_artifact, load_artifact, schema_fingerprint
+
+CONFIG_SOURCE = """\
+from typing import List
+
+from redband import BaseConfig, EntrypointConfig
+
+
+class OptConfig(BaseConfig):
+    group__: str = "test_artifact_module_optimizer"
+    lr: float = 0.1
+
+
+class MainConfig(EntrypointConfig):
+    optimizer: OptConfig = OptConfig()
+    layers: List[int] = [1, 2]
+"""
+
+
+class OptConfig(BaseConfig):
+    group__: str = "test_artifact_optimizer"
+    lr: float = 0.1
+
+
+class AdamConfig(OptConfig):
+    beta: float = 0.9
+
+
+class MainConfig(EntrypointConfig):
+    optimizer: OptConfig = AdamConfig()
+    threshold: float = math.inf
+
+
+def _import_source(tmp_path, module_name: str):
+    file_path = tmp_path / f"{module_name}.py"
+    file_path.write_text(CONFIG_SOURCE)
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize("suffix", [".rbc", ".py"])
+def test_non_finite_floats_round_trip(tmp_path, suffix):
+    file_path = str(tmp_path / f"config{suffix}")
+    build_artifact(MainConfig(threshold=math.inf), file_path)
+    config = load_artifact(file_path, config_class=MainConfig)
+    assert config.threshold == math.inf
+    assert isinstance(config.optimizer, AdamConfig)
+
+    build_artifact(MainConfig(threshold=math.nan), file_path)
+    assert math.isnan(load_artifact(file_path, config_class=MainConfig).threshold)
+
+
+def test_fingerprint_is_module_independent(tmp_path):
+    # e.g. an entrypoint script imported by `redband build`, then run as `__main__`
+    built_module = _import_source(tmp_path, "_redband_entrypoint_test")
+    run_module = _import_source(tmp_path, "rb_test_artifact_main")
+    assert schema_fingerprint(built_module.MainConfig) == schema_fingerprint(run_module.MainConfig)
+
+    file_path = str(tmp_path / "config.rbc")
+    build_artifact(built_module.MainConfig(), file_path)
+    assert load_artifact(file_path, config_class=run_module.MainConfig).layers == [1, 2]
+
+
+def test_changed_selected_config_is_rejected(tmp_path):
+    file_path = str(tmp_path / "config.rbc")
+    build_artifact(MainConfig(), file_path)
+    assert isinstance(load_artifact(file_path, config_class=MainConfig).optimizer, AdamConfig)
+
+    # the declared `OptConfig` is unchanged, but the selected `AdamConfig` isn't
+    AdamConfig._add_fields(eps=(float, 1e-8))
+    try:
+        with pytest.raises(ArtifactException, match="rebuild"):
+            load_artifact(file_path, config_class=MainConfig)
+    finally:
+        del AdamConfig.__fields__["eps"]
+        del AdamConfig.__annotations__["eps"]
+    load_artifact(file_path, config_class=MainConfig)
@@ -0,0 +1,74 @@
+import gc
+import os
+
+import pytest
+
+from redband import BaseConfig, EntrypointConfig
+from redband.cli import get_args_parser
+from redband.diagnostics import _count_config_classes, measure_memory_growth, profile_memory
+from redband.entrypoint import _compose
+from redband.library import ConfigLibrary
+
+# composing under tracemalloc takes a few ms, so the full stress test only runs if this is set
+RUN_SLOW_TESTS_ENV_VAR = "RB_RUN_SLOW_TESTS"
+
+# allows for one-off allocations (e.g. the interpreter resizing its interned strings), which are well below what
+# even a small per-composition leak retains over thousands of compositions
+MAX_MEMORY_GROWTH = 2 * 1024 * 1024
+
+
+class OptimizerConfig(BaseConfig):
+    group__: str = "test_diagnostics_optimizer"
+    lr: float = 0.1
+
+
+class MainConfig(EntrypointConfig):
+    n: int = 1
+    optimizer: OptimizerConfig = OptimizerConfig()
+
+
+def _main(config: MainConfig) -> None:
+    ...
+
+
+def _compose_func(config_lib=None):
+    config_lib = config_lib if config_lib is not None else ConfigLibrary()
+    cli_args = get_args_parser().parse_args(["n=3", "optimizer.lr=0.5"])
+    return lambda: _compose(cli_args, entrypoint_func=_main, config_lib=config_lib)
+
+
+def test_composition_retains_no_config_classes():
+    compose = _compose_func()
+    compose()
+    gc.collect()
+    n_config_classes = _count_config_classes()
+    assert measure_memory_growth(compose, n_iterations=1_000) < MAX_MEMORY_GROWTH
+    # the private copies of the entrypoint config class made by each composition are all freed
+    gc.collect()
+    assert _count_config_classes() == n_config_classes
+
+
+@pytest.mark.skipif(not os.getenv(RUN_SLOW_TESTS_ENV_VAR), reason=f"set {RUN_SLOW_TESTS_ENV_VAR}=1 to run")
+def test_composition_memory_is_flat():
+    assert measure_memory_growth(_compose_func(), n_iterations=100_000) < MAX_MEMORY_GROWTH
+
+
+def test_profile_memory():
+    config_lib = ConfigLibrary()
+    compose = _compose_func(config_lib)
+    with profile_memory("compose", config_lib=config_lib) as cold_profile:
+        compose()
+    # the first composition fills the ConfigLibrary
+    assert cold_profile.library_growth > 0
+    assert cold_profile.library_size == cold_profile.library_growth
+
+    with profile_memory("compose", config_lib=config_lib) as profile:
+        config = compose()
+        del config
+    assert profile.label == "compose" and profile.duration_s > 0
+    # nothing created by a (warm) composition outlives it
+    assert profile.model_fields == 0
+    assert profile.config_classes == 0
+    assert profile.config_instances == 0
+    assert profile.library_growth == 0
+    assert str(profile).startswith("[redband] memory profile: compose")
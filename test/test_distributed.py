@@ -0,0 +1,100 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from redband.distributed import DistributedException, get_distributed_context
+
+WORLD_SIZE = 3
+
+ENTRYPOINT_SOURCE = """\
+import json
+import os
+
+import redband
+
+
+class DistributedMainConfig(redband.EntrypointConfig):
+    n: int = 1
+
+
+@redband.entrypoint
+def main(config: DistributedMainConfig) -> None:
+    print(json.dumps({"rank": int(os.environ["RANK"]), "n": config.n}))
+
+
+if __name__ == "__main__":
+    main()
+"""
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _launch(tmp_path, extra_env):
+    """Launches the entrypoint on WORLD_SIZE local ranks, only passing the override to rank 0 s.t. other ranks
+    only see it if they received rank 0's config. Returns the `n` each rank ran with.
+    """
+    entrypoint_file_path = tmp_path / "main.py"
+    entrypoint_file_path.write_text(ENTRYPOINT_SOURCE)
+    repo_dir = str(Path(__file__).resolve().parents[1])
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(p for p in [repo_dir, os.getenv("PYTHONPATH")] if p),
+        "WORLD_SIZE": str(WORLD_SIZE),
+        "RB_BROADCAST_TIMEOUT": "30",
+        **extra_env,
+    }
+    processes = [
+        subprocess.Popen(
+            [sys.executable, str(entrypoint_file_path), *(["n=3"] if rank == 0 else [])],
+            cwd=str(tmp_path),
+            env={**env, "RANK": str(rank)},
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        for rank in range(WORLD_SIZE)
+    ]
+    results = {}
+    for process in processes:
+        stdout, stderr = process.communicate(timeout=60)
+        assert process.returncode == 0, stderr.decode()
+        result = json.loads(stdout.decode().strip().splitlines()[-1])
+        results[result["rank"]] = result["n"]
+    return results
+
+
+def test_broadcast_over_tcp(tmp_path):
+    env = {"MASTER_ADDR": "127.0.0.1", "RB_BROADCAST_PORT": str(_free_port())}
+    assert _launch(tmp_path, env) == {rank: 3 for rank in range(WORLD_SIZE)}
+
+
+def test_broadcast_over_rendezvous_file(tmp_path):
+    rendezvous_file = tmp_path / "rendezvous.json"
+    # the config of a previous launch, which must never be received
+    stale_payload = {"__config__": "__main__:DistributedMainConfig", "values": {"n": 7}}
+    rendezvous_file.write_text(json.dumps({"launch_id": "launch-1", "config": stale_payload}) + "\n")
+
+    env = {"RB_RENDEZVOUS_FILE": str(rendezvous_file), "RB_LAUNCH_ID": "launch-2"}
+    assert _launch(tmp_path, env) == {rank: 3 for rank in range(WORLD_SIZE)}
+    assert json.loads(rendezvous_file.read_text())["launch_id"] == "launch-2"
+
+
+def test_rendezvous_file_requires_launch_id(tmp_path, monkeypatch):
+    for env_var in ["RB_LAUNCH_ID", "TORCHELASTIC_RUN_ID", "SLURM_JOB_ID", "SLURM_RESTART_COUNT", "RB_DISTRIBUTED"]:
+        monkeypatch.delenv(env_var, raising=False)
+    monkeypatch.setenv("WORLD_SIZE", str(WORLD_SIZE))
+    monkeypatch.setenv("RANK", "1")
+    monkeypatch.setenv("RB_RENDEZVOUS_FILE", str(tmp_path / "rendezvous.json"))
+    with pytest.raises(DistributedException, match="requires a launch ID"):
+        get_distributed_context()
+
+    monkeypatch.setenv("SLURM_JOB_ID", "1234")
+    assert get_distributed_context().launch_id == "1234.0"
@@ -0,0 +1,80 @@
+import multiprocessing
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+from redband import BaseConfig, EntrypointConfig
+from redband.cli import get_args_parser
+from redband.entrypoint import _compose
+from redband.library import ConfigLibrary
+
+
+class OptimizerConfig(BaseConfig):
+    group__: str = "test_optimizer"
+    lr: float = 0.1
+
+
+class SgdConfig(OptimizerConfig):
+    momentum: float = 0.0
+
+
+class MainConfig(EntrypointConfig):
+    n: int = 1
+    optimizer: OptimizerConfig = OptimizerConfig()
+
+
+def _main(config: MainConfig) -> None:
+    ...
+
+
+def _get_n(config: MainConfig) -> int:
+    return config.n
+
+
+def _compose_main(*overrides: str) -> MainConfig:
+    cli_args = get_args_parser().parse_args(list(overrides))
+    return _compose(cli_args, entrypoint_func=_main, config_lib=ConfigLibrary())
+
+
+def test_composed_config_is_instance_of_user_class():
+    config = _compose_main("n=3")
+    assert type(config) is MainConfig
+    assert config.n == 3 and config.group__ == "entrypoint"
+    # composition doesn't mutate the user's class
+    assert MainConfig().n == 1
+
+
+def test_composed_config_pickles():
+    config = _compose_main("n=3")
+    restored_config = pickle.loads(pickle.dumps(config))
+    assert type(restored_config) is MainConfig
+    assert restored_config == config
+    assert restored_config.optimizer.lr == 0.1
+
+    with multiprocessing.Pool(1) as pool:
+        assert pool.apply(_get_n, (config,)) == 3
+
+
+def test_concurrent_compositions_dont_interfere():
+    config_lib = ConfigLibrary()
+
+    def _compose_with_overrides(i: int) -> MainConfig:
+        # odd compositions select another optimizer, overriding a parameter only it has
+        overrides = [f"n={i}", f"optimizer.lr={i}"]
+        if i % 2:
+            overrides.extend(["optimizer=SgdConfig", f"optimizer.momentum={i}"])
+        cli_args = get_args_parser().parse_args(overrides)
+        return _compose(cli_args, entrypoint_func=_main, config_lib=config_lib)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        configs = list(executor.map(_compose_with_overrides, range(200)))
+
+    for i, config in enumerate(configs):
+        assert config.n == i and config.optimizer.lr == i
+        if i % 2:
+            assert type(config.optimizer) is SgdConfig and config.optimizer.momentum == i
+        else:
+            assert type(config.optimizer) is OptimizerConfig
+    # neither the entrypoint config class nor any sub-config class (or default) was mutated
+    assert MainConfig().n == 1 and MainConfig().optimizer.lr == 0.1
+    assert MainConfig.__fields__["optimizer"].get_default().lr == 0.1
+    assert OptimizerConfig().lr == 0.1 and SgdConfig().momentum == 0.0
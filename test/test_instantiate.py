@@ -0,0 +1,173 @@
+import gc
+import time
+from typing import List
+
+import pytest
+
+from redband import InstantiableConfig, instantiate
+from redband.instantiate import _instance_cache, clear_instance_cache, InstantiationException, LazySequence
+
+
+class Counter(object):
+    def __init__(self, value: int = 0):
+        self.value = value
+
+
+class Pair(object):
+    def __init__(self, left: Counter, right: Counter):
+        self.left = left
+        self.right = right
+
+
+class Shard(object):
+    # the indices of all the shards that have been created
+    created: List[int] = []
+
+    def __init__(self, index: int):
+        if index < 0:
+            raise ValueError("negative shard index")
+        Shard.created.append(index)
+        self.index = index
+
+
+class Dataset(object):
+    def __init__(self, shards):
+        self.shards = shards
+
+
+class CounterConfig(InstantiableConfig):
+    group__: str = "counter"
+    target__: str = f"{__name__}.Counter"
+    value: int = 0
+
+
+class PairConfig(InstantiableConfig):
+    group__: str = "pair"
+    target__: str = f"{__name__}.Pair"
+    left: CounterConfig = CounterConfig(scope__="singleton")
+    right: CounterConfig = CounterConfig(scope__="singleton")
+
+
+class ShardConfig(InstantiableConfig):
+    group__: str = "shard"
+    target__: str = f"{__name__}.Shard"
+    index: int
+
+
+class DatasetConfig(InstantiableConfig):
+    group__: str = "dataset"
+    target__: str = f"{__name__}.Dataset"
+    shards: List[ShardConfig]
+
+
+@pytest.fixture(autouse=True)
+def _clear_instance_cache():
+    clear_instance_cache()
+    yield
+    clear_instance_cache()
+
+
+@pytest.fixture(autouse=True)
+def _clear_created_shards():
+    Shard.created.clear()
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_per_call_creates_new_objects():
+    config = CounterConfig(value=1)
+    counter = instantiate(config)
+    assert isinstance(counter, Counter) and counter.value == 1
+    assert instantiate(config) is not counter
+    # instantiating doesn't mutate the config
+    assert config.recursive__ and config.value == 1
+
+
+@pytest.mark.parametrize("scope", ["singleton", "per_process"])
+def test_identical_configs_share_objects(scope):
+    counter = instantiate(CounterConfig(value=1, scope__=scope))
+    assert instantiate(CounterConfig(value=1, scope__=scope)) is counter
+    assert instantiate(CounterConfig(value=2, scope__=scope)) is not counter
+    assert instantiate(CounterConfig(value=1)) is not counter
+
+
+def test_nested_singletons_are_shared():
+    pair = instantiate(PairConfig())
+    assert isinstance(pair.left, Counter)
+    assert pair.left is pair.right
+
+
+def test_singletons_are_evicted_when_unreferenced():
+    counter = instantiate(CounterConfig(value=1, scope__="singleton"))
+    assert len(_instance_cache._weak) == 1
+    del counter
+    gc.collect()
+    assert len(_instance_cache._weak) == 0
+    # no locks are left behind for evicted keys
+    assert len(_instance_cache._key_locks) == 0
+
+
+def test_clear_instance_cache():
+    counter = instantiate(CounterConfig(value=1, scope__="per_process"))
+    clear_instance_cache("singleton")
+    assert instantiate(CounterConfig(value=1, scope__="per_process")) is counter
+    clear_instance_cache("per_process")
+    assert instantiate(CounterConfig(value=1, scope__="per_process")) is not counter
+
+
+def test_nested_list_configs_are_instantiated():
+    dataset = instantiate(DatasetConfig(shards=[ShardConfig(index=i) for i in range(3)]))
+    assert [shard.index for shard in dataset.shards] == [0, 1, 2]
+
+
+def test_lazy_instantiation():
+    dataset = instantiate(DatasetConfig(shards=[ShardConfig(index=i) for i in range(5)]), lazy__=True)
+    assert isinstance(dataset.shards, LazySequence) and len(dataset.shards) == 5
+    assert Shard.created == []
+
+    shard = dataset.shards[2]
+    assert shard.index == 2 and Shard.created == [2]
+    # elements are cached once instantiated
+    assert dataset.shards[-3] is shard and Shard.created == [2]
+    assert [s.index for s in dataset.shards[3:]] == [3, 4]
+
+
+def test_lazy_and_eager_objects_are_not_shared():
+    config = DatasetConfig(shards=[ShardConfig(index=i) for i in range(3)], scope__="per_process")
+    lazy_dataset = instantiate(config, lazy__=True)
+    assert isinstance(lazy_dataset.shards, LazySequence)
+
+    dataset = instantiate(config)
+    assert dataset is not lazy_dataset and isinstance(dataset.shards, list)
+    assert instantiate(config) is dataset
+    assert instantiate(config, lazy__=True) is lazy_dataset
+    assert instantiate(config, lazy__=True, read_ahead__=1) is not lazy_dataset
+
+
+def test_lazy_read_ahead():
+    with instantiate([ShardConfig(index=i) for i in range(6)], lazy__=True, read_ahead__=2) as shards:
+        assert shards[0].index == 0
+        # accessing an element schedules the next `read_ahead__` elements only
+        _wait_for(lambda: sorted(Shard.created) == [0, 1, 2])
+        assert sorted(shards._futures) == [0, 1, 2]
+        assert shards[1].index == 1
+        _wait_for(lambda: sorted(Shard.created) == [0, 1, 2, 3])
+    assert shards._executor is None
+
+    # once closed, elements are instantiated on access (without read-ahead)
+    assert shards[5].index == 5
+    assert sorted(shards._futures) == [0, 1, 2, 3, 5]
+
+
+def test_lazy_errors_are_reraised():
+    shards = instantiate([ShardConfig(index=0), ShardConfig(index=-1)], lazy__=True, read_ahead__=1)
+    assert shards[0].index == 0
+    for _ in range(2):
+        with pytest.raises(InstantiationException, match="negative shard index"):
+            shards[1]
+    shards.close()
@@ -0,0 +1,116 @@
+import os
+import pickle
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from redband.base import is_config_node
+from redband.library import ConfigLibrary, ConfigLibraryException, fill_config_library
+
+
+def _write_config_lib(root, name: str, config_name: str) -> None:
+    (root / name).mkdir()
+    (root / name / "__init__.py").write_text("")
+    (root / name / "opt.py").write_text(
+        textwrap.dedent(
+            f"""
+            from redband import BaseConfig
+
+            class {config_name}(BaseConfig):
+                group__: str = "optimizer"
+            """
+        )
+    )
+
+
+@pytest.fixture
+def config_lib_dirs(tmp_path, monkeypatch):
+    _write_config_lib(tmp_path, "rb_test_liba", "OnlyInA")
+    _write_config_lib(tmp_path, "rb_test_libb", "OnlyInB")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "rb_test_liba", "rb_test_libb"
+    for module_name in [m for m in sys.modules if m.startswith("rb_test_lib")]:
+        del sys.modules[module_name]
+
+
+def test_libraries_are_isolated(config_lib_dirs):
+    liba_dir, libb_dir = config_lib_dirs
+    entrypoint_file_path = "main.py"
+    config_lib_b = fill_config_library(entrypoint_file_path, libb_dir, ConfigLibrary(source_paths=[libb_dir]))
+    config_lib_a = fill_config_library(entrypoint_file_path, liba_dir, ConfigLibrary(source_paths=[liba_dir]))
+
+    assert set(config_lib_a.get_config_group("optimizer")) == {"OnlyInA"}
+    assert set(config_lib_b.get_config_group("optimizer")) == {"OnlyInB"}
+
+
+def test_libraries_include_all_imported_configs(config_lib_dirs):
+    liba_dir, _ = config_lib_dirs
+    # e.g. configs imported by the entrypoint from another package
+    __import__("rb_test_libb.opt")
+    config_lib = fill_config_library("main.py", liba_dir, ConfigLibrary())
+    assert {"OnlyInA", "OnlyInB"} <= set(config_lib.get_config_group("optimizer"))
+
+
+def test_frozen_library(config_lib_dirs):
+    liba_dir, _ = config_lib_dirs
+    config_lib = fill_config_library("main.py", liba_dir, ConfigLibrary(source_paths=[liba_dir])).freeze()
+    with pytest.raises(ConfigLibraryException):
+        config_lib.add(config_lib.get_config_group("optimizer")["OnlyInA"])
+
+    restored_config_lib = pickle.loads(pickle.dumps(config_lib))
+    assert restored_config_lib.frozen and restored_config_lib.source_paths == config_lib.source_paths
+    assert is_config_node(restored_config_lib.get_config_group("optimizer")["OnlyInA"])
+
+
+SIBLING_CONFIGS_SOURCE = """\
+from redband import BaseConfig
+
+
+class SiblingOptConfig(BaseConfig):
+    group__: str = "optimizer"
+    lr: float = 0.1
+
+
+class SiblingAdamConfig(SiblingOptConfig):
+    beta: float = 0.9
+"""
+
+SIBLING_ENTRYPOINT_SOURCE = """\
+import redband
+from myconfigs import SiblingOptConfig
+
+
+class MainConfig(redband.EntrypointConfig):
+    optimizer: SiblingOptConfig = SiblingOptConfig()
+
+
+@redband.entrypoint
+def main(config: MainConfig) -> None:
+    print(type(config.optimizer).__name__)
+
+
+if __name__ == "__main__":
+    main()
+"""
+
+
+def test_configs_imported_from_sibling_module_can_be_selected(tmp_path):
+    (tmp_path / "myconfigs.py").write_text(SIBLING_CONFIGS_SOURCE)
+    (tmp_path / "main.py").write_text(SIBLING_ENTRYPOINT_SOURCE)
+    repo_dir = str(Path(__file__).resolve().parents[1])
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(p for p in [repo_dir, os.getenv("PYTHONPATH")] if p)}
+    env.pop("RB_CONFIG_LIB_DIR", None)
+
+    result = subprocess.run(
+        [sys.executable, "main.py", "optimizer=SiblingAdamConfig"],
+        cwd=str(tmp_path),
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    assert result.returncode == 0, result.stderr.decode()
+    assert result.stdout.decode().strip() == "SiblingAdamConfig"
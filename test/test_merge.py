@@ -0,0 +1,80 @@
+from typing import List, Optional
+
+import pytest
+from pydantic import ValidationError
+
+from redband import BaseConfig, EntrypointConfig, merge
+from redband.merge import MergeException, SELECTED_CONFIG_KEY
+
+
+class OptConfig(BaseConfig):
+    group__: str = "test_merge_optimizer"
+    lr: float = 0.1
+
+
+class AdamConfig(OptConfig):
+    beta: float = 0.9
+
+
+class SgdConfig(OptConfig):
+    momentum: float = 0.0
+
+
+class MainConfig(EntrypointConfig):
+    n: int = 1
+    layers: List[int] = [1, 2]
+    dropout: Optional[float] = None
+    optimizer: OptConfig = AdamConfig()
+
+
+def test_merge_into_config_class():
+    config_class = merge(MainConfig._copy(), {"n": "3", "layers": [3, 4], "dropout": 0.5})
+    config = config_class()
+    assert config.n == 3 and config.layers == [3, 4] and config.dropout == 0.5
+    # only the private copy is merged into
+    assert MainConfig().n == 1
+
+    with pytest.raises(ValidationError):
+        merge(MainConfig._copy(), {"layers": "x"})
+
+
+def test_merge_into_sub_configs():
+    config = merge(MainConfig._copy(), {"optimizer": {"lr": 0.5}})()
+    assert type(config.optimizer) is AdamConfig
+    assert config.optimizer.lr == 0.5 and config.optimizer.beta == 0.9
+    # sub-configs are never merged into inplace
+    assert MainConfig().optimizer.lr == 0.1
+    assert MainConfig.__fields__["optimizer"].get_default().lr == 0.1
+
+
+def test_merge_selected_config():
+    config_dict = {"optimizer": {"momentum": 0.5, SELECTED_CONFIG_KEY: SgdConfig}}
+    config = merge(MainConfig._copy(), config_dict)()
+    assert type(config.optimizer) is SgdConfig
+    assert config.optimizer.momentum == 0.5 and config.optimizer.lr == 0.1
+
+    # values of an earlier selection are merged into by later config dicts
+    config_class = merge(MainConfig._copy(), {"optimizer": {SELECTED_CONFIG_KEY: SgdConfig}})
+    config = merge(config_class, {"optimizer": {"momentum": 0.9}})()
+    assert type(config.optimizer) is SgdConfig and config.optimizer.momentum == 0.9
+
+
+def test_merge_added_parameters():
+    config = merge(MainConfig._copy(), {"seed": 7})()
+    assert config.seed == 7
+    assert "seed" not in MainConfig.__fields__
+
+
+def test_merge_into_config_instance():
+    config = MainConfig(n=2)
+    merged_config = merge(config, {"dropout": 0.1, "optimizer": {"beta": 0.5}})
+    assert type(merged_config) is MainConfig
+    assert merged_config.n == 2 and merged_config.dropout == 0.1
+    assert type(merged_config.optimizer) is AdamConfig and merged_config.optimizer.beta == 0.5
+    # config instances are never mutated
+    assert config.dropout is None and config.optimizer.beta == 0.9
+
+    with pytest.raises(MergeException, match="has no such parameter"):
+        merge(config, {"seed": 7})
+    with pytest.raises(MergeException, match="Can only merge into"):
+        merge({"n": 1}, {"n": 2})
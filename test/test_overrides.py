@@ -0,0 +1,70 @@
+import pytest
+
+from redband import BaseConfig, EntrypointConfig
+from redband.library import ConfigLibrary
+from redband.overrides import coerce_overrides, get_group_selections, OverrideException, parse_overrides
+
+
+class OptConfig(BaseConfig):
+    group__: str = "test_overrides_optimizer"
+    lr: float = 0.1
+
+
+class AdamConfig(OptConfig):
+    beta: float = 0.9
+
+
+class SgdConfig(OptConfig):
+    momentum: float = 0.0
+
+
+class MainConfig(EntrypointConfig):
+    n: int = 1
+    optimizer: OptConfig = AdamConfig()
+
+
+@pytest.fixture
+def config_lib():
+    config_lib = ConfigLibrary()
+    for config_class in [OptConfig, AdamConfig, SgdConfig]:
+        config_lib.add(config_class)
+    return config_lib
+
+
+def _coerce(config_lib, *overrides, selected_classes=None):
+    return coerce_overrides(MainConfig, parse_overrides(list(overrides)), config_lib, selected_classes)
+
+
+def test_values_are_coerced(config_lib):
+    assert _coerce(config_lib, "n=3", "optimizer.lr=0.5") == {"n": 3, "optimizer.lr": 0.5}
+    with pytest.raises(OverrideException, match="'n=x'"):
+        _coerce(config_lib, "n=x")
+    with pytest.raises(OverrideException, match="has no parameter 'momentum'"):
+        _coerce(config_lib, "optimizer.momentum=0.5")
+
+
+def test_overrides_are_checked_against_selections(config_lib):
+    assert _coerce(config_lib, "optimizer=SgdConfig", "optimizer.momentum=0.5") == {
+        "optimizer": "SgdConfig",
+        "optimizer.momentum": 0.5,
+    }
+    with pytest.raises(OverrideException, match="is not a config in the"):
+        _coerce(config_lib, "optimizer=RmsPropConfig")
+
+
+def test_overrides_are_checked_against_instance_defaults(config_lib):
+    assert _coerce(config_lib, "optimizer.beta=0.5") == {"optimizer.beta": 0.5}
+    with pytest.raises(OverrideException, match="has no parameter 'beta'"):
+        _coerce(config_lib, "optimizer=SgdConfig", "optimizer.beta=0.5")
+
+
+def test_overrides_are_checked_against_yaml_selections(config_lib):
+    yaml_config_dict = {"n": 2, "optimizer": "SgdConfig"}
+    selected_classes = get_group_selections(MainConfig, yaml_config_dict, config_lib)
+    assert selected_classes == {"optimizer": SgdConfig}
+
+    overrides = ["optimizer.momentum=0.5"]
+    assert _coerce(config_lib, *overrides, selected_classes=selected_classes) == {"optimizer.momentum": 0.5}
+    # selections on the command-line take precedence over those in the YAML
+    with pytest.raises(OverrideException, match="'AdamConfig' has no parameter 'momentum'"):
+        _coerce(config_lib, "optimizer=AdamConfig", *overrides, selected_classes=selected_classes)
@@ -0,0 +1,185 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+import redband
+from redband import BaseConfig, EntrypointConfig
+from redband.library import ConfigLibrary, fill_config_library
+from redband.schema import bash_completion_script, build_schema_index, complete, format_help, get_schema_index
+
+CONFIG_LIB_SOURCE = """\
+from redband import BaseConfig
+
+
+class SchemaSchedulerConfig(BaseConfig):
+    group__: str = "test_schema_module_scheduler"
+    warmup: int = 0
+"""
+
+
+class OptConfig(BaseConfig):
+    group__: str = "test_schema_optimizer"
+    lr: float = 0.1
+
+
+class AdamConfig(OptConfig):
+    beta: float = 0.9
+
+
+class SgdConfig(OptConfig):
+    momentum: float = 0.0
+
+
+class MainConfig(EntrypointConfig):
+    run_name: str
+    epochs: int = 10
+    debug: bool = False
+    optimizer: OptConfig = AdamConfig()
+
+
+def _config_lib() -> ConfigLibrary:
+    return fill_config_library(__file__, config_lib=ConfigLibrary(source_paths=[__file__]))
+
+
+@pytest.fixture
+def schema_index():
+    return build_schema_index(MainConfig, _config_lib())
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("RB_CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+def test_build_schema_index(schema_index):
+    keys = schema_index["keys"]
+    # the keys of sub-configs are those of their default (selected) config
+    assert list(keys) == ["run_name", "epochs", "debug", "optimizer", "optimizer.lr", "optimizer.beta"]
+    assert keys["run_name"] == {"type": "str", "default": None, "required": True, "group": None, "choices": []}
+    assert keys["epochs"] == {"type": "int", "default": "10", "required": False, "group": None, "choices": []}
+    assert keys["debug"]["type"] == "bool" and keys["debug"]["default"] == "False"
+    assert keys["optimizer"] == {
+        "type": "OptConfig",
+        "default": "AdamConfig",
+        "required": False,
+        "group": "test_schema_optimizer",
+        "choices": ["AdamConfig", "OptConfig", "SgdConfig"],
+    }
+    assert keys["optimizer.lr"]["default"] == "0.1" and keys["optimizer.beta"]["default"] == "0.9"
+    assert schema_index["groups"] == {
+        "entrypoint": ["MainConfig"],
+        "test_schema_optimizer": ["AdamConfig", "OptConfig", "SgdConfig"],
+    }
+
+
+def test_get_schema_index_is_cached(cache_dir, tmp_path):
+    config_lib_dir = tmp_path / "configs"
+    config_lib_dir.mkdir()
+    config_lib_file = config_lib_dir / "scheduler.py"
+    config_lib_file.write_text(CONFIG_LIB_SOURCE)
+
+    builds = []
+
+    def _build_config_lib() -> ConfigLibrary:
+        builds.append(1)
+        return _config_lib()
+
+    schema_index = get_schema_index(MainConfig, str(config_lib_dir), _build_config_lib)
+    assert len(builds) == 1 and len(list(cache_dir.glob("schema-*.json"))) == 1
+    assert get_schema_index(MainConfig, str(config_lib_dir), _build_config_lib) == schema_index
+    assert len(builds) == 1
+
+    # modifying a config source file invalidates the cached index
+    mtime_ns = config_lib_file.stat().st_mtime_ns + 1_000_000_000
+    os.utime(config_lib_file, ns=(mtime_ns, mtime_ns))
+    assert get_schema_index(MainConfig, str(config_lib_dir), _build_config_lib) == schema_index
+    assert len(builds) == 2
+    get_schema_index(MainConfig, str(config_lib_dir), _build_config_lib)
+    assert len(builds) == 2
+
+    # as does a corrupted cache file
+    for cache_file in cache_dir.glob("schema-*.json"):
+        cache_file.write_text("{")
+    assert get_schema_index(MainConfig, str(config_lib_dir), _build_config_lib) == schema_index
+    assert len(builds) == 3
+
+
+def test_format_help(schema_index):
+    help_lines = format_help(schema_index, prog="main.py").splitlines()
+    assert help_lines[0].startswith("usage: main.py [key=value ...]")
+    assert help_lines[help_lines.index("Overridable config keys:") + 1].split() == ["run_name", "str", "(required)"]
+    epochs_line = next(line for line in help_lines if line.strip().startswith("epochs"))
+    assert epochs_line.split() == ["epochs", "int", "(default:", "10)"]
+    optimizer_line = next(line for line in help_lines if line.strip().startswith("optimizer "))
+    assert optimizer_line.endswith("(default: AdamConfig)  choices: AdamConfig, OptConfig, SgdConfig")
+    assert "Config groups:" in help_lines
+    assert "  test_schema_optimizer: AdamConfig, OptConfig, SgdConfig" in help_lines
+
+
+def test_complete(schema_index):
+    # config keys
+    assert complete(schema_index, "") == [f"{key}=" for key in schema_index["keys"]]
+    assert complete(schema_index, "opt") == ["optimizer=", "optimizer.lr=", "optimizer.beta="]
+    assert complete(schema_index, "optimizer.l") == ["optimizer.lr="]
+    assert complete(schema_index, "nope") == []
+
+    # additions & deletions, the latter of which don't take a value
+    assert complete(schema_index, "+ep") == ["+epochs="]
+    assert complete(schema_index, "~ep") == ["~epochs"]
+
+    # group choices & boolean values
+    assert complete(schema_index, "optimizer=") == [
+        "optimizer=AdamConfig",
+        "optimizer=OptConfig",
+        "optimizer=SgdConfig",
+    ]
+    assert complete(schema_index, "optimizer=S") == ["optimizer=SgdConfig"]
+    assert complete(schema_index, "+optimizer=A") == ["+optimizer=AdamConfig"]
+    assert complete(schema_index, "debug=") == ["debug=true", "debug=false"]
+    assert complete(schema_index, "epochs=") == []
+    assert complete(schema_index, "nope=") == []
+
+
+def test_bash_completion_script(tmp_path):
+    entrypoint_file_path = str(tmp_path / "my-main.py")
+    script = bash_completion_script("/usr/bin/python3", entrypoint_file_path)
+    assert "_redband_complete_my_main_py()" in script
+    assert f'"/usr/bin/python3" "{entrypoint_file_path}" --complete "$cur"' in script
+    assert script.rstrip().endswith(
+        f"complete -o nospace -F _redband_complete_my_main_py my-main.py ./my-main.py {entrypoint_file_path}"
+    )
+
+
+def test_entrypoint_help_and_completion_skip_composition(cache_dir, monkeypatch, capsys):
+    @redband.entrypoint(config_lib=_config_lib())
+    def main(config: MainConfig) -> None:
+        raise AssertionError("The entrypoint shouldn't run")
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("Config composition shouldn't happen")
+
+    # NB: `redband.entrypoint` is the decorator, not the module
+    entrypoint_module = sys.modules["redband.entrypoint"]
+    monkeypatch.setattr(entrypoint_module, "_compose", _fail)
+
+    # the first run builds (& caches) the schema index
+    monkeypatch.setattr(sys, "argv", ["main.py", "--help"])
+    main()
+    cold_help = capsys.readouterr().out
+    assert cold_help.startswith("usage: main.py")
+
+    # later runs don't even fill the ConfigLibrary
+    monkeypatch.setattr(entrypoint_module, "fill_config_library", _fail)
+    main()
+    assert capsys.readouterr().out == cold_help
+
+    monkeypatch.setattr(sys, "argv", ["main.py", "--complete", "optimizer=S"])
+    main()
+    assert capsys.readouterr().out == "optimizer=SgdConfig\n"
+
+    monkeypatch.setattr(sys, "argv", ["main.py", "--shell-completion", "bash"])
+    main()
+    assert f'"{Path(__file__).resolve()}" --complete' in capsys.readouterr().out
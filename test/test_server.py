@@ -0,0 +1,88 @@
+import os
+import sys
+
+import pytest
+
+from redband.serialization import _resolve_config_class, CONFIG_KEY, config_to_payload, ENTRYPOINT_MODULE_PREFIX
+from redband.server import ComposeServer
+
+CONFIG_LIB_SOURCE = """\
+from redband import BaseConfig
+
+
+class ServerOptimizerConfig(BaseConfig):
+    group__: str = "test_server_optimizer"
+    lr: float = {lr}
+"""
+
+ENTRYPOINT_SOURCE = """\
+import redband
+from configs.optim import ServerOptimizerConfig
+
+
+class ServerMainConfig(redband.EntrypointConfig):
+    optimizer: ServerOptimizerConfig = ServerOptimizerConfig()
+
+
+@redband.entrypoint
+def main(config: ServerMainConfig) -> None:
+    ...
+"""
+
+
+def _write_project(project_dir, lr: float) -> None:
+    (project_dir / "configs").mkdir(parents=True)
+    (project_dir / "configs" / "optim.py").write_text(CONFIG_LIB_SOURCE.format(lr=lr))
+    (project_dir / "main.py").write_text(ENTRYPOINT_SOURCE)
+
+
+def _request(project_dir, *argv: str):
+    return {
+        "entrypoint_file_path": str(project_dir / "main.py"),
+        "entrypoint_name": "main",
+        "argv": list(argv),
+        "cwd": str(project_dir),
+        "sys_path": [str(project_dir)] + sys.path,
+        "config_lib_dir": None,
+    }
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    monkeypatch.chdir(tmp_path)
+    server = ComposeServer(str(tmp_path / "redband.sock"))
+    yield server
+    server.server_close()
+    for name in list(sys.modules):
+        if name.split(".")[0] == "configs" or name.startswith(ENTRYPOINT_MODULE_PREFIX):
+            del sys.modules[name]
+
+
+def test_config_lib_dir_from_argv_is_tracked(server, tmp_path):
+    project_dir = tmp_path / "project"
+    _write_project(project_dir, lr=0.1)
+    assert server.compose(_request(project_dir, "--config-lib-dir", "configs")).optimizer.lr == 0.1
+
+    config_lib_file = project_dir / "configs" / "optim.py"
+    config_lib_file.write_text(CONFIG_LIB_SOURCE.format(lr=0.2))
+    mtime_ns = config_lib_file.stat().st_mtime_ns + 1_000_000_000
+    os.utime(config_lib_file, ns=(mtime_ns, mtime_ns))
+    assert server.compose(_request(project_dir, "--config-lib-dir", "configs")).optimizer.lr == 0.2
+
+
+def test_projects_with_same_package_name_are_isolated(server, tmp_path):
+    _write_project(tmp_path / "a", lr=0.1)
+    _write_project(tmp_path / "b", lr=0.2)
+    for _ in range(2):
+        assert server.compose(_request(tmp_path / "a", "--config-lib-dir", "configs")).optimizer.lr == 0.1
+        assert server.compose(_request(tmp_path / "b", "--config-lib-dir", "configs")).optimizer.lr == 0.2
+
+
+def test_entrypoint_config_classes_are_recorded_in_main(server, tmp_path):
+    project_dir = tmp_path / "project"
+    _write_project(project_dir, lr=0.1)
+    config = server.compose(_request(project_dir, "--config-lib-dir", "configs"))
+    class_path = config_to_payload(config)[CONFIG_KEY]
+    assert class_path == "__main__:ServerMainConfig"
+    assert _resolve_config_class(class_path) is type(config)
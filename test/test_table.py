@@ -0,0 +1,167 @@
+from typing import List, Optional
+
+import pytest
+
+from redband import BaseConfig, EntrypointConfig, util as rb_util
+from redband.table import (
+    BOOL,
+    CATEGORY,
+    ConfigTable,
+    ConfigTableException,
+    FLOAT,
+    INT,
+    JSON_,
+    load_configs,
+    save_configs,
+)
+
+np = pytest.importorskip("numpy")
+
+
+class OptConfig(BaseConfig):
+    group__: str = "test_table_optimizer"
+    lr: float = 0.1
+
+
+class AdamConfig(OptConfig):
+    name__: str = "adam"
+    beta: float = 0.9
+
+
+class SgdConfig(OptConfig):
+    name__: str = "sgd"
+    momentum: float = 0.0
+
+
+class MainConfig(EntrypointConfig):
+    seed: int = 0
+    debug: bool = False
+    activation: Optional[str] = None
+    layers: List[int] = [1, 2]
+    optimizer: OptConfig = AdamConfig()
+
+
+CONFIG_DICTS = [
+    {"seed": 0, "debug": True, "activation": "relu", "layers": [1, 2], "optimizer": {"lr": 0.1}},
+    {"seed": 1, "debug": False, "activation": None, "layers": [3], "optimizer": {"lr": 0.01, "beta": 0.5}},
+    {"debug": False, "activation": "gelu", "layers": [], "optimizer": {"lr": 0.001}},
+]
+
+
+def _configs() -> List[MainConfig]:
+    return [
+        MainConfig(seed=0, activation="relu", optimizer=AdamConfig(lr=1e-4)),
+        MainConfig(seed=1, optimizer=AdamConfig(lr=1e-2)),
+        MainConfig(seed=2, activation="gelu", optimizer=SgdConfig(lr=1e-4, momentum=0.9)),
+    ]
+
+
+def test_from_dicts():
+    table = ConfigTable.from_dicts(CONFIG_DICTS)
+    assert len(table) == 3
+    assert table.keys == ["seed", "debug", "activation", "layers", "optimizer.lr", "optimizer.beta"]
+    assert table.kind("debug") == BOOL
+    assert table.kind("activation") == CATEGORY
+    assert table.kind("layers") == JSON_
+    assert table.kind("optimizer.lr") == FLOAT
+    assert "optimizer" not in table and "optimizer.lr" in table
+
+    # category nulls are stored as -1 codes into the sorted categories
+    assert table._columns["activation"]["values"].tolist() == [1, -1, 0]
+    assert table._columns["activation"]["categories"].tolist() == ["gelu", "relu"]
+    assert table["activation"].tolist() == ["relu", None, "gelu"]
+
+    # ints that are missing values fall back to floats, s.t. they can hold NaN
+    assert table.kind("seed") == FLOAT
+    assert table["seed"][:2].tolist() == [0.0, 1.0] and np.isnan(table["seed"][2])
+    assert np.isnan(table["optimizer.beta"][0]) and table["optimizer.beta"][1] == 0.5
+
+    assert table["layers"].tolist() == [[1, 2], [3], []]
+    assert table.to_dicts()[1] == {
+        "seed": 1.0,
+        "debug": False,
+        "layers": [3],
+        "optimizer": {"lr": 0.01, "beta": 0.5},
+    }
+
+
+def test_from_configs():
+    table = ConfigTable.from_configs(_configs())
+    assert table.kind("seed") == INT
+    assert table["seed"].tolist() == [0, 1, 2]
+    assert table.kind("optimizer.name__") == CATEGORY
+    assert table["optimizer.name__"].tolist() == ["adam", "adam", "sgd"]
+    assert table["name__"].tolist() == ["MainConfig"] * 3
+    # parameters of only some selected sub-configs are null for the others
+    assert np.isnan(table["optimizer.momentum"][:2]).all() and table["optimizer.momentum"][2] == 0.9
+    assert table.kind("layers") == JSON_
+
+    configs = table.where("seed>=1").to_configs(MainConfig)
+    assert [config.seed for config in configs] == [1, 2]
+    assert configs[0].layers == [1, 2] and configs[0].activation is None
+
+
+def test_from_yamls(tmp_path):
+    yaml_paths = []
+    for i, config_dict in enumerate(CONFIG_DICTS):
+        yaml_path = str(tmp_path / f"config_{i}.yaml")
+        rb_util.save_yaml(config_dict, yaml_path)
+        yaml_paths.append(yaml_path)
+    (tmp_path / "empty.yaml").write_text("")
+    yaml_paths.append(str(tmp_path / "empty.yaml"))
+
+    table = ConfigTable.from_yamls(yaml_paths)
+    assert len(table) == 4
+    assert table["activation"].tolist() == ["relu", None, "gelu", None]
+    assert table.to_dicts()[:3] == ConfigTable.from_dicts(CONFIG_DICTS).to_dicts()
+    assert table.to_dicts()[3] == {}
+
+
+def test_where():
+    table = ConfigTable.from_configs(_configs())
+    # the group key alone resolves to the `name__` of the selected sub-config
+    assert table.where("optimizer=adam", "optimizer.lr<1e-3")["seed"].tolist() == [0]
+    assert table.where("optimizer!=adam")["seed"].tolist() == [2]
+    assert table.where("optimizer.lr==1e-4")["seed"].tolist() == [0, 2]
+    assert table.where("activation='relu'")["seed"].tolist() == [0]
+    # null categories never match
+    assert table.where("activation!=relu")["seed"].tolist() == [2]
+    assert table.where("debug=false", "layers=[1, 2]")["seed"].tolist() == [0, 1, 2]
+    assert len(table.where("optimizer=rmsprop")) == 0
+
+    with pytest.raises(ConfigTableException, match="no column"):
+        table.where("scheduler=cosine")
+    with pytest.raises(ConfigTableException, match="Could not parse"):
+        table.where("seed")
+    with pytest.raises(ConfigTableException, match="Could not compare"):
+        table.where("seed<abc")
+
+
+@pytest.mark.parametrize(
+    "table_fn", [lambda: ConfigTable.from_dicts(CONFIG_DICTS), lambda: ConfigTable.from_configs(_configs())]
+)
+def test_save_load_round_trip(tmp_path, table_fn):
+    table = table_fn()
+    file_path = str(tmp_path / "table.npz")
+    table.save(file_path)
+    loaded_table = ConfigTable.load(file_path)
+
+    assert len(loaded_table) == len(table)
+    assert loaded_table.keys == table.keys
+    for key in table.keys:
+        assert loaded_table.kind(key) == table.kind(key)
+    assert loaded_table._columns["activation"]["values"].tolist() == table._columns["activation"]["values"].tolist()
+    assert loaded_table.to_dicts() == table.to_dicts()
+
+
+def test_save_load_configs(tmp_path):
+    file_path = str(tmp_path / "configs.npz")
+    save_configs(_configs(), file_path)
+    config_dicts = load_configs(file_path)
+    assert [config_dict["optimizer"]["name__"] for config_dict in config_dicts] == ["adam", "adam", "sgd"]
+    assert config_dicts[2]["optimizer"]["momentum"] == 0.9 and "momentum" not in config_dicts[0]["optimizer"]
+
+    configs = load_configs(file_path, config_class=MainConfig)
+    assert [config.seed for config in configs] == [0, 1, 2]
+    assert [config.activation for config in configs] == ["relu", None, "gelu"]
+    assert [config.optimizer.lr for config in configs] == [1e-4, 1e-2, 1e-4]